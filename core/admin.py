@@ -1,19 +1,32 @@
+import io
+import mimetypes
+import zipfile
 from datetime import date, timedelta
+from functools import lru_cache
 from django.contrib import admin, messages
+from django.contrib.admin.utils import get_fields_from_path
+from django.contrib.admin.views.autocomplete import AutocompleteJsonView
+from django.contrib.admin.widgets import AdminFileWidget, AutocompleteSelect
 from django.urls import path, reverse
 from django import forms
-from django.core.exceptions import ValidationError
-from django.http import FileResponse, HttpResponseRedirect, HttpResponseBadRequest
-from django.utils.html import format_html
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect, HttpResponseBadRequest
+from django.utils.html import format_html, conditional_escape
 from django.shortcuts import redirect, get_object_or_404, render
-from django.db.models import Sum, F, Value, ExpressionWrapper, DecimalField, Q,F, IntegerField
-from django.db.models.functions import Coalesce
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.functional import cached_property
+from django.utils.http import content_disposition_header, http_date
+from django.db.models import Sum, F, Value, DecimalField, Q,F, IntegerField
+from django.db.models import OuterRef, Subquery, Prefetch
+from django.db.models.functions import Coalesce, Greatest
 from django.utils.timezone import now
 from django.utils import timezone
 from pathlib import Path
 from decimal import Decimal
 from calendar import month_name, monthrange
-from core.models.common import money_int_pk
 from core.models.raw_material import BAG_WEIGHT_KG, RawMaterialPurchasePayment
 
 # ✅ remove the bad absolute import; use relative imports only
@@ -27,9 +40,15 @@ from core.models import (
 )
 from core.models.raw_material import RawMaterialTxn, SupplierPayment, RawMaterialPurchasePayment
 from core.services.purchase_pdf import generate_rm_purchase_statement
+from core.services.pdf_cache import cached_customer_pdf, cached_order_invoice
 from core.services.signals_billing import propagate_carry_forward
-from core.utils_billing import compute_customer_balance_as_of
-from core.utils_money import to_rupees_int
+from core.services.ar_simple import refresh_orders_billing
+from core.utils_billing import (
+    compute_customer_balance_as_of, annotate_customer_balance, produced_kg_subquery,
+    order_grand_total_subquery,
+)
+from core.models.orders import site_tax_ratio
+from core.utils_money import to_rupees_int, fmt_paisa
 from core.utils_weight import D, dkg
 
 # ✅ Payment/Allocation live in models_ar, import them from there (not from .models)
@@ -50,42 +69,433 @@ STATUS_STYLES = {
     "CLOSED":    {"bg": "#d1fae5", "fg": "#064e3b", "bd": "#6ee7b7"},  # emerald
     "CANCELLED": {"bg": "#fee2e2", "fg": "#7f1d1d", "bd": "#fecaca"},  # red
 }
+_STATUS_PILL_OPEN = (
+    '<span style="display:inline-block;padding:.25rem .5rem;border-radius:999px;'
+    'border:1px solid {bd};background:{bg};color:{fg};font-weight:600;'
+    'font-size:12px;line-height:1;white-space:nowrap;">'
+)
+_STATUS_FALLBACK = {"bg": "#eee", "fg": "#111", "bd": "#ddd"}
+
+# opening <span> per style, escaped once; a pill is then prefix + escape(label)
+_STATUS_PILL_PREFIX = {code: format_html(_STATUS_PILL_OPEN, **s) for code, s in STATUS_STYLES.items()}
+_STATUS_PILL_PREFIX_FALLBACK = format_html(_STATUS_PILL_OPEN, **_STATUS_FALLBACK)
+
+
+def _status_pill(code, label):
+    prefix = _STATUS_PILL_PREFIX.get(code, _STATUS_PILL_PREFIX_FALLBACK)
+    return mark_safe(prefix + conditional_escape(label) + "</span>")
+
+
+# rendered once at import: the changelist cell is a single dict lookup
+STATUS_BADGE_HTML = {code: _status_pill(code, label) for code, label in Order.STATUS_CHOICES}
+
+def _available_material_kg_bulk(customer_ids):
+    """
+    Returns {customer_id: Decimal kg balance} from the ledger in one GROUP BY query.
+    Customers without ledger rows map to Decimal('0').
+    """
+    ids = {int(getattr(c, "pk", c)) for c in customer_ids}
+    balances = dict.fromkeys(ids, Decimal('0'))
+    if not ids:
+        return balances
+    rows = (
+        CustomerMaterialLedger.objects
+        .filter(customer_id__in=ids)
+        .order_by()
+        .values("customer_id")
+        .annotate(b=Sum('delta_kg'))
+    )
+    for row in rows:
+        balances[row["customer_id"]] = row["b"] or Decimal('0')
+    return balances
+
 
 def _available_material_kg(customer):
     """
     Returns Decimal kg balance from the ledger for the given customer.
+    Customer instances are request-scoped, so the value is memoized on the instance
+    (or read from CustomerAdmin's mat_balance_calc annotation) instead of re-aggregated.
     """
-    agg = (
-        CustomerMaterialLedger.objects
-        .filter(customer=customer)
-        .aggregate(
-            b=Coalesce(Sum('delta_kg'), Value(Decimal('0'), output_field=KG))
-        )
+    pk = getattr(customer, "pk", customer)
+    if pk is None:
+        return Decimal('0')
+    if not isinstance(customer, Customer):
+        return _available_material_kg_bulk([pk])[int(pk)]
+    cached = customer.__dict__.get("_available_kg")
+    if cached is None:
+        cached = getattr(customer, "mat_balance_calc", None)
+    if cached is None:
+        cached = _available_material_kg_bulk([pk])[int(pk)]
+    customer.__dict__["_available_kg"] = cached
+    return cached
+
+def _with_payment_totals(qs):
+    """
+    Annotate Payments with allocated_calc = Σ allocations.amount (correlated subquery,
+    so no GROUP BY over a JOIN). Payment.allocated_amount / unapplied_amount read it.
+    """
+    allocated_sq = (
+        PaymentAllocation.objects
+        .filter(payment_id=OuterRef("pk"))
+        .values("payment_id")
+        .annotate(s=Sum("amount"))
+        .values("s")[:1]
+    )
+    return qs.annotate(
+        # allocations are whole PKR (BigIntegerField): keep the sum an int, no Decimal per row
+        allocated_calc=Coalesce(Subquery(allocated_sq, output_field=IntegerField()), Value(0, output_field=IntegerField())),
+    )
+
+FILE_RESPONSE_BLOCK_SIZE = 1 << 16
+
+
+def _sendfile_bases():
+    """(local dir, internal URL prefix) pairs the front-end server aliases for X-Accel-Redirect."""
+    return (
+        (getattr(settings, "INVOICE_OUTPUT_DIR", "invoices"), getattr(settings, "PDF_SENDFILE_PREFIX", "/protected-pdf/")),
+        (settings.MEDIA_ROOT, getattr(settings, "MEDIA_SENDFILE_PREFIX", "/protected-media/")),
     )
-    return agg['b'] or Decimal('0')
 
-class PaymentSelect(forms.Select):
+
+def _file_response(file_path, *, as_attachment=False, filename=None, content_type=None, request=None):
     """
-    Select widget that can disable options and style them (strike-through).
-    We pass `disabled_ids` when constructing the widget.
+    Serve a local file without copying it through Python where possible:
+      - PDF_SENDFILE_HEADER="X-Accel-Redirect" → nginx streams <prefix>/<relative path>
+        (invoice dir → PDF_SENDFILE_PREFIX, MEDIA_ROOT → MEDIA_SENDFILE_PREFIX)
+      - PDF_SENDFILE_HEADER="X-Sendfile"       → apache streams the absolute path
+      - otherwise FileResponse on an open file, which Django hands to wsgi.file_wrapper (sendfile)
+    With `request`, ETag/Last-Modified from the file's stat turn repeat hits into 304s.
     """
-    def __init__(self, *args, disabled_ids=None, **kwargs):
-        self.disabled_ids = set(disabled_ids or [])
-        super().__init__(*args, **kwargs)
+    file_path = Path(file_path).resolve()
+    st = file_path.stat()
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    if request is not None:
+        not_modified = get_conditional_response(request, etag=etag, last_modified=int(st.st_mtime))
+        if not_modified is not None:
+            return not_modified
+    resp = _file_response_body(file_path, as_attachment, filename, content_type)
+    resp["ETag"] = etag
+    resp["Last-Modified"] = http_date(st.st_mtime)
+    # revalidate every time: documents are regenerated in place / behind the same URL
+    patch_cache_control(resp, private=True, no_cache=True)
+    return resp
+
+
+def _file_response_body(file_path, as_attachment, filename, content_type):
+    filename = filename or file_path.name
+    content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    header = getattr(settings, "PDF_SENDFILE_HEADER", "")
+
+    if header:
+        value = None
+        if header.lower() == "x-accel-redirect":
+            for base, prefix in _sendfile_bases():
+                try:
+                    rel = file_path.relative_to(Path(base).resolve()).as_posix()
+                except ValueError:
+                    continue
+                value = f"{prefix.rstrip('/')}/{rel}"
+                break
+        else:
+            value = str(file_path)
+        if value:
+            resp = HttpResponse(content_type=content_type)
+            resp[header] = value
+            resp["Content-Disposition"] = content_disposition_header(as_attachment, filename)
+            return resp
+
+    resp = FileResponse(open(file_path, "rb"), as_attachment=as_attachment, filename=filename,
+                        content_type=content_type)
+    resp.block_size = FILE_RESPONSE_BLOCK_SIZE  # without file_wrapper: 64 KiB reads, not 4 KiB
+    return resp
+
+
+def _pdf_response(pdf_path, *, as_attachment=False, filename=None, request=None):
+    return _file_response(pdf_path, as_attachment=as_attachment, filename=filename,
+                          content_type="application/pdf", request=request)
+
+
+class _ProtectedFieldFile:
+    """Stands in for a saved FieldFile in the file widget: same name, protected view URL."""
+    def __init__(self, name, url):
+        self.name, self.url = name, url
+
+    def __str__(self):
+        return self.name
+
+
+class ProtectedFileWidget(AdminFileWidget):
+    """AdminFileWidget whose "Currently:" link goes to a permission-checked view, not /media/."""
+    def __init__(self, url_name, *url_args, attrs=None):
+        super().__init__(attrs)
+        self.url_name, self.url_args = url_name, url_args
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        pk = getattr(getattr(value, "instance", None), "pk", None)
+        if self.is_initial(value) and pk is not None:
+            url = reverse(self.url_name, args=[pk, *self.url_args])
+            context["widget"]["value"] = _ProtectedFieldFile(value.name, url)
+        return context
+
+
+class ProtectedFilesMixin:
+    """
+    File fields listed in protected_file_urls ({field: (url name, *extra args)}) link to
+    that download view; the upload folders are not served under MEDIA_URL.
+    """
+    protected_file_urls = {}
+
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        if db_field.name in self.protected_file_urls:
+            kwargs["widget"] = ProtectedFileWidget(*self.protected_file_urls[db_field.name])
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
+
+
+# reverse() walks the resolver every call; the URLconf is fixed at runtime, so resolve
+# each name once and fill per-object pks with str.format.
+_PK_SENTINEL = 987654321
+
+
+@lru_cache(maxsize=None)
+def _url_template(name):
+    return reverse(name, args=[_PK_SENTINEL]).replace(str(_PK_SENTINEL), "{}")
+
+
+@lru_cache(maxsize=None)
+def _url_plain(name):
+    return reverse(name)
+
+
+def _admin_url(name, pk=None):
+    return _url_plain(name) if pk is None else _url_template(name).format(pk)
+
+
+@lru_cache(maxsize=None)
+def _payment_link_template():
+    """'<a href="…/payment/{pk}/change/">Pmt #{pk}</a>' with the URL escaped once."""
+    url = conditional_escape(_url_template("admin:core_payment_change")).replace("{}", "{pk}")
+    return f'<a href="{url}">Pmt #{{pk}}</a>'
+
+
+@lru_cache(maxsize=None)
+def _changelist_filter_url(name, lookup):
+    """'<changelist url>?<lookup>={}' built once; callers .format(pk)."""
+    return f"{_url_plain(name)}?{lookup}={{}}"
+
+
+_MONEY = "PKR {:,}".format
+
+
+def _money_pk(value):
+    """'PKR 123,456' for int-rupee columns; money_int_pk without humanize's intcomma per cell."""
+    return _MONEY(int(value or 0))
+
+
+def _fmt_pkr2(n):
+    """PKR int → '12,345.00' (Order money is whole rupees; skip Decimal ',.2f')."""
+    return f"{int(n or 0):,}.00"
+
+
+def _fmt_kg(val):
+    """Decimal kg (3 dp) → '12,345.678' via int grams."""
+    g = int((val or 0) * 1000)
+    sign = "-" if g < 0 else ""
+    g = abs(g)
+    return f"{sign}{g // 1000:,}.{g % 1000:03d}"
+
+
+def _with_order_totals(qs):
+    """
+    Annotate Orders with produced_kg_calc (Σ rolls), total_paid_calc (Σ allocations) and
+    grand_total_calc. Order.produced_kg / total_allocated_pkr / grand_total_pkr read these,
+    so outstanding costs no aggregate (and no Site Settings lookup for GST) per row.
+    """
+    paid_sq = (
+        PaymentAllocation.objects
+        .filter(order_id=OuterRef("pk"))
+        .values("order_id")
+        .annotate(s=Sum("amount"))
+        .values("s")[:1]
+    )
+    return qs.annotate(
+        produced_kg_calc=produced_kg_subquery(),
+        total_paid_calc=Coalesce(Subquery(paid_sq, output_field=IntegerField()), Value(0, output_field=IntegerField())),
+        grand_total_calc=order_grand_total_subquery(site_tax_ratio()),
+    )
+
+def _payment_label_qs(qs=None):
+    """
+    Payments narrowed to what Payment.__str__ / the unapplied cells read (stored
+    unapplied_amount_paisa + customer name); notes (TEXT), bank etc. stay unloaded.
+    """
+    qs = Payment.objects.all() if qs is None else qs
+    return qs.select_related("customer").only(
+        "id", "customer_id", "customer__company_name", "received_on", "amount", "unapplied_amount_paisa",
+    )
+
+
+def _allocation_related_prefetch():
+    """Prefetch an allocation's order (totals annotated) and payment: 2 queries per page."""
+    return (
+        Prefetch("order", queryset=_with_order_totals(Order.objects.select_related("customer"))),
+        Prefetch("payment", queryset=_payment_label_qs()),
+    )
+
+
+class InlinePaginationMixin:
+    """
+    Page an inline's existing rows (?<prefix>_page=N) instead of rendering all of them.
+    Pager links render under the table (core/admin/edit_inline/tabular_paginated.html).
+    """
+    per_page = 25
+    template = "core/admin/edit_inline/tabular_paginated.html"
+
+    def get_formset(self, request, obj=None, **kwargs):
+        FormSet = super().get_formset(request, obj, **kwargs)
+        per_page = self.per_page
+        params = request.GET.copy()
+
+        class PaginatedFormSet(FormSet):
+            def get_queryset(self2):
+                if not hasattr(self2, "_page_qs"):
+                    param = f"{self2.prefix}_page"
+                    paginator = Paginator(super().get_queryset(), per_page)
+                    self2.page = paginator.get_page(params.get(param))
+                    self2.page_links = []
+                    for n in paginator.page_range:
+                        q = params.copy()
+                        q[param] = n
+                        self2.page_links.append((n, "?" + q.urlencode()))
+                    self2._page_qs = self2.page.object_list
+                return self2._page_qs
+
+        return PaginatedFormSet
+
+
+ESTIMATED_COUNT_MIN_ROWS = 10_000
+
+
+def _estimated_row_count(model, using):
+    """Planner/engine row estimate for model's table, or None where the backend has none."""
+    conn = connections[using]
+    table = model._meta.db_table
+    with conn.cursor() as cursor:
+        if conn.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        elif conn.vendor == "mysql":
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables"
+                " WHERE table_schema = DATABASE() AND table_name = %s",
+                [table],
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Changelist paginator: an unfiltered list of a big table uses the engine's row
+    estimate instead of COUNT(*) over the annotated (subquery-wrapped) queryset.
+    Filtered/searched lists and small tables still count exactly.
+    """
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if not qs.query.where:
+            estimate = _estimated_row_count(qs.model, qs.db)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_MIN_ROWS:
+                return estimate
+        return super().count
+
+
+class AutocompleteListFilter(admin.RelatedFieldListFilter):
+    """
+    FK list filter rendered as an admin autocomplete box (select2 over the related
+    admin's search_fields) instead of one link per related row, which on customers /
+    employees means a query + a sidebar entry for every row of that table.
+    The ModelAdmin must include AutocompleteFilterMixin for the select2 assets.
+    """
+    template = "core/admin/filters/autocomplete.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self._field = field
+        self._admin_site = model_admin.admin_site
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def field_choices(self, field, request, model_admin):
+        return []  # nothing listed up front; the widget fetches matches on demand
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        self.clear_query_string = changelist.get_query_string(
+            remove=[self.lookup_kwarg, self.lookup_kwarg_isnull],
+        )
+        yield {
+            "selected": not self.lookup_val and not self.lookup_val_isnull,
+            "query_string": self.clear_query_string,
+            "display": "All",
+        }
+
+    def widget_html(self):
+        value = self.lookup_val
+        if isinstance(value, (list, tuple)):  # Django ≥5 keeps every value of the param
+            value = value[-1] if value else None
+        form_field = forms.ModelChoiceField(
+            queryset=self._field.remote_field.model._default_manager.all(),
+            required=False,
+            widget=AutocompleteSelect(self._field, self._admin_site, attrs={"style": "width:100%"}),
+        )
+        return form_field.widget.render(self.lookup_kwarg, value)
+
+
+class AutocompleteFilterMixin:
+    """Adds the select2 / autocomplete.js media AutocompleteListFilter needs to the changelist."""
+    @property
+    def media(self):
+        media = super().media
+        for spec in self.list_filter:
+            if isinstance(spec, (list, tuple)) and spec[1] is AutocompleteListFilter:
+                field = get_fields_from_path(self.model, spec[0])[-1]
+                return media + AutocompleteSelect(field, self.admin_site).media
+        return media
+
+
+def _is_changelist(request):
+    match = getattr(request, "resolver_match", None)
+    return bool(match and (match.url_name or "").endswith("_changelist"))
+
+class UnappliedPaymentAutocompleteView(AutocompleteJsonView):
+    """
+    admin autocomplete for the allocation payment picker: only payments that still
+    have unapplied balance, optionally scoped by ?customer=<id>. Choices are fetched
+    on demand (20 per page) instead of rendering every payment as an <option>.
+    """
+    def get_queryset(self):
+        # results are labelled with str(payment): load only the columns __str__ reads
+        qs = _payment_label_qs(super().get_queryset())
+        customer_id = self.request.GET.get("customer")
+        if customer_id:
+            qs = qs.filter(customer_id=customer_id)
+        return qs.filter(unapplied_amount_paisa__gt=0)  # indexed column
+
+
+class UnappliedPaymentSelect(AutocompleteSelect):
+    """AutocompleteSelect pointed at UnappliedPaymentAutocompleteView for one customer."""
+    def __init__(self, field, admin_site, customer_id=None, **kwargs):
+        self.customer_id = customer_id
+        super().__init__(field, admin_site, **kwargs)
+
+    def get_url(self):
+        url = reverse(f"{self.admin_site.name}:payment-autocomplete-unapplied")
+        return f"{url}?customer={self.customer_id}" if self.customer_id else url
 
-    def create_option(self, name, value, label, selected, index, subindex=None, attrs=None):
-        option = super().create_option(name, value, label, selected, index, subindex=subindex, attrs=attrs)
-        try:
-            pk = int(option.get("value"))
-        except (TypeError, ValueError):
-            pk = None
-        if pk in self.disabled_ids:
-            option.setdefault("attrs", {})
-            option["attrs"]["disabled"] = True
-            option["attrs"]["style"] = "text-decoration: line-through; color:#9ca3af;"
-            # Optional: make it visually clear
-            option["label"] = f"{option['label']} (fully allocated)"
-        return option
 
 class PaymentAllocationForOrderForm(forms.ModelForm):
     class Meta:
@@ -93,8 +503,9 @@ class PaymentAllocationForOrderForm(forms.ModelForm):
         fields = "__all__"
 
     def __init__(self, *args, **kwargs):
-        # parent order object is injected by the inline (below)
+        # parent order object + admin site are injected by the inline (below)
         order_obj = kwargs.pop("order_obj", None)
+        admin_site = kwargs.pop("admin_site", admin.site)
         super().__init__(*args, **kwargs)
 
         field = self.fields["payment"]
@@ -105,53 +516,42 @@ class PaymentAllocationForOrderForm(forms.ModelForm):
             field.help_text = "Save the order first to choose customer payments."
             return
 
-        money = DecimalField(max_digits=18, decimal_places=2)
-
-        # Annotate each Payment with allocated sum so we can filter/label efficiently.
-        qs = (
-            Payment.objects
-            .filter(customer=order_obj.customer)
-            .annotate(
-                allocated=Coalesce(Sum("allocations__amount"), Value(Decimal("0.00"), output_field=money))
-            )
-            .order_by("-received_on", "-id")
+        # validation against real rows; nothing is rendered up front. The widget only
+        # labels the selected payment (str), so the same narrowed columns suffice.
+        field.queryset = _payment_label_qs(Payment.objects.filter(customer_id=order_obj.customer_id))
+        field.widget = UnappliedPaymentSelect(
+            PaymentAllocation._meta.get_field("payment"),
+            admin_site,
+            customer_id=order_obj.customer_id,
         )
-
-        # Build choices + disabled list
-        choices = []
-        disabled_ids = []
-        for p in qs:
-            unapplied = (p.amount or Decimal("0.00")) - (getattr(p, "allocated", Decimal("0.00")) or Decimal("0.00"))
-            label = f"Pmt #{p.id} — Unapplied ${unapplied:,.2f} / Total ${p.amount:,.2f} [{p.method}] on {p.received_on}"
-            choices.append((p.pk, label))
-            if unapplied <= 0:
-                disabled_ids.append(p.pk)
-
-        field.queryset = qs  # validation against real rows
-        field.widget = PaymentSelect(disabled_ids=disabled_ids)
-        field.choices = choices
         field.help_text = "Pick a payment with remaining unapplied balance."
 
-class PaymentAllocationInline(admin.TabularInline):
+class PaymentAllocationInline(InlinePaginationMixin, admin.TabularInline):
     model = PaymentAllocation
     extra = 0
     fields = ("order", "amount", "applied_on",
               "order_outstanding_now", "payment_unapplied_now")  # + new
     readonly_fields = ("order_outstanding_now", "payment_unapplied_now")
     autocomplete_fields = ("order",)
+    # stable order so ?<prefix>_page=N always shows the same slice
+    ordering = ("-applied_on", "-id")
+
+    def get_queryset(self, request):
+        # order/payment (+ customers) arrive pre-annotated, so the "now" columns cost no queries
+        return super().get_queryset(request).prefetch_related(*_allocation_related_prefetch())
 
     def order_outstanding_now(self, obj):
         if not obj or not obj.pk:
             return "—"
-        # uses your Order.outstanding_balance property
-        return f"{obj.order.outstanding_balance:,.2f}"
+        # uses your Order.outstanding_balance_pkr property (int PKR)
+        return _fmt_pkr2(obj.order.outstanding_balance_pkr)
     order_outstanding_now.short_description = "Order Outstanding (now)"
 
     def payment_unapplied_now(self, obj):
         if not obj or not obj.pk:
             return "—"
-        # uses Payment.unapplied_amount property
-        return f"{obj.payment.unapplied_amount:,.2f}"
+        # uses Payment.unapplied_amount_paisa property
+        return fmt_paisa(obj.payment.unapplied_amount_paisa)
     payment_unapplied_now.short_description = "Payment Unapplied (now)"
     def has_add_permission(self, request, obj=None):
         return False
@@ -163,104 +563,161 @@ class PaymentAllocationAdmin(admin.ModelAdmin):
         "id", "customer_name", "payment", "order",
         "amount", "order_outstanding_now", "payment_unapplied_now", "applied_on"
     )
-    list_filter  = ("applied_on", "order__status", "order__customer")
+    list_filter  = ("applied_on", "order__status", ("order__customer", admin.RelatedOnlyFieldListFilter))
     search_fields = ("order__invoice_number", "payment__reference", "order__customer__company_name")
     ordering = ("-applied_on", "-id")
     list_per_page = 50
+    # () not False: the changelist would otherwise select_related payment/order,
+    # and cached FKs are skipped by the annotated Prefetch below
+    list_select_related = ()
+
+    def get_queryset(self, request):
+        # order/payment (+ customers) arrive pre-annotated, so the "now" columns cost no queries
+        qs = super().get_queryset(request).prefetch_related(*_allocation_related_prefetch())
+        if _is_changelist(request):
+            qs = qs.only("id", "amount", "applied_on", "order_id", "payment_id")
+        return qs
 
     def customer_name(self, obj):
         return getattr(obj.order.customer, "company_name", "")
     customer_name.short_description = "Customer"
 
     def order_outstanding_now(self, obj):
-        return f"{obj.order.outstanding_balance:,.2f}"
+        return _fmt_pkr2(obj.order.outstanding_balance_pkr)
     order_outstanding_now.short_description = "Order Outstanding (now)"
 
     def payment_unapplied_now(self, obj):
-        return f"{obj.payment.unapplied_amount:,.2f}"
+        return fmt_paisa(obj.payment.unapplied_amount_paisa)
     payment_unapplied_now.short_description = "Payment Unapplied (now)"
 
 
+class UnappliedFilter(admin.SimpleListFilter):
+    title = "Leftover"
+    parameter_name = "unapplied"
+
+    def lookups(self, request, model_admin):
+        return [("yes", "Has leftover"), ("no", "Fully allocated")]
+
+    def queryset(self, request, queryset):
+        # hits the unapplied_amount_paisa index
+        if self.value() == "yes":
+            return queryset.filter(unapplied_amount_paisa__gt=0)
+        if self.value() == "no":
+            return queryset.filter(unapplied_amount_paisa__lte=0)
+        return queryset
+
+
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ("id", "customer", "received_on", "method", "reference",
                     "amount_display", "allocated_amount_display", "unapplied_amount_display")
-    list_filter = ("method", "received_on", "customer")
+    list_filter = ("method", UnappliedFilter, "received_on", ("customer", admin.RelatedOnlyFieldListFilter))
     search_fields = ("reference", "customer__company_name")
+    list_select_related = ("customer",)
     inlines = [PaymentAllocationInline]
+    autocomplete_fields = ("customer",)
     readonly_fields = ()
     actions = ["auto_apply_selected"]
     ordering = ("-received_on", "-id")
     list_per_page = 50
 
-    @admin.display(description="Amount (PKR)")
+    def get_queryset(self, request):
+        qs = _with_payment_totals(super().get_queryset(request))
+        if _is_changelist(request):
+            # list columns only; notes (TEXT) / bank are for the change form
+            qs = qs.select_related("customer").only(
+                "id", "customer_id", "customer__company_name", "received_on",
+                "method", "reference", "amount", "unapplied_amount_paisa",
+            )
+        return qs
+
+    @cached_property
+    def _custom_urls(self):
+        # built once per admin instance; Django rebuilds .urls on every access
+        return [
+            path(
+                "autocomplete-unapplied/",
+                self.admin_site.admin_view(UnappliedPaymentAutocompleteView.as_view(admin_site=self.admin_site)),
+                name="payment-autocomplete-unapplied",
+            ),
+        ]
+
+    def get_urls(self):
+        return self._custom_urls + super().get_urls()
+
+    @admin.display(description="Amount (PKR)", ordering="amount")
     def amount_display(self, obj):
         # Shows 0 once payments ≥ initial carry
-        return money_int_pk(obj.amount)
+        return _money_pk(obj.amount)
     
-    @admin.display(description="Allocated (PKR)")
+    @admin.display(description="Allocated (PKR)", ordering="allocated_calc")
     def allocated_amount_display(self, obj):
-        # Shows 0 once payments ≥ initial carry
-        return money_int_pk(obj.allocated_amount)
-    
-    @admin.display(description="Leftover (PKR)")
-    def unapplied_amount_display(self, obj):
-        # Shows 0 once payments ≥ initial carry
-        return money_int_pk(obj.unapplied_amount)
+        # allocated_calc is annotated in get_queryset (int PKR); fallback to the live property
+        calc = getattr(obj, "allocated_calc", None)
+        n = int(obj.allocated_amount) if calc is None else calc
+        return _MONEY(n)
     
-    @admin.display(description="Leftover (PKR)")
+    @admin.display(description="Leftover (PKR)", ordering="unapplied_amount_paisa")
     def unapplied_amount_display(self, obj):
-        # prefer stored field; fallback to live compute
-        val = getattr(obj, "unapplied_amount", None)
-        if val is None:
-            val = obj.unapplied_amount
-        try:
-            n = int(val or 0)
-        except (TypeError, ValueError):
-            n = 0
+        # stored column (paisa), truncated to whole rupees
+        p = obj.unapplied_amount_paisa
+        n = p // 100 if p >= 0 else -(-p // 100)
 
         if n >= 0:
-            return f"PKR {n:,}"
+            return _MONEY(n)
         # overpaid → show positive with credit label
-        return f"PKR {abs(n):,} (credit)"
+        return f"{_MONEY(-n)} (credit)"
 
-class OrderAllocationInlineReadonly(admin.TabularInline):
+class OrderAllocationInlineReadonly(InlinePaginationMixin, admin.TabularInline):
     model = PaymentAllocation
     extra = 0
     can_delete = False
     # show helpful columns
     fields = ("payment_link", "amount", "applied_on", "order_outstanding_now", "payment_unapplied_now")
     readonly_fields = ("payment_link", "amount", "applied_on", "order_outstanding_now", "payment_unapplied_now")
+    ordering = ("-applied_on", "-id")
 
     def has_add_permission(self, request, obj=None):
         # no blank form rows -> avoids "this field is required"
         return False
 
+    def get_formset(self, request, obj=None, **kwargs):
+        # every row's order is the parent, already annotated by OrderAdmin.get_queryset
+        # (inline instances are per request, so this does not leak between requests)
+        self._parent_order = obj
+        return super().get_formset(request, obj, **kwargs)
+
+    def get_queryset(self, request):
+        # payments (+ customers) in one query; the order side is the parent (see get_formset)
+        return super().get_queryset(request).prefetch_related(_allocation_related_prefetch()[1])
+
     # pretty link to the payment
     def payment_link(self, obj):
         if not obj.pk:
             return "—"
-        url = reverse("admin:core_payment_change", args=[obj.payment_id])
-        return format_html('<a href="{}">Pmt #{}</a>', url, obj.payment_id)
+        # payment_id is an int: fill the pre-escaped template, no format_html per row
+        pk = int(obj.payment_id)
+        return mark_safe(_payment_link_template().format(pk=pk))
     payment_link.short_description = "Payment"
 
     # the two convenience “remaining” columns you already added
     def order_outstanding_now(self, obj):
-        return f"{obj.order.outstanding_balance:,.2f}"
+        order = getattr(self, "_parent_order", None) or obj.order
+        return _fmt_pkr2(order.outstanding_balance_pkr)
     order_outstanding_now.short_description = "Order Outstanding (now)"
 
     def payment_unapplied_now(self, obj):
-        return f"{obj.payment.unapplied_amount:,.2f}"
+        return fmt_paisa(obj.payment.unapplied_amount_paisa)
     payment_unapplied_now.short_description = "Payment Unapplied (now)"
 
 
 ## NOT IN USE ANYMORE
-class OrderAllocationInline(admin.TabularInline):
+class OrderAllocationInline(InlinePaginationMixin, admin.TabularInline):
     model = PaymentAllocation
     extra = 0
     fields = ("payment", "amount", "applied_on")
-    # Remove autocomplete so our custom widget/labels show up
-    # autocomplete_fields = ("payment",)
+    # server-side search; the form narrows it to unapplied payments of the order's customer
+    autocomplete_fields = ("payment",)
 
     # show the two convenience columns you added earlier (optional)
     readonly_fields = ()
@@ -272,10 +729,12 @@ class OrderAllocationInline(admin.TabularInline):
         and compute unapplied/total labels.
         """
         parent_order = obj
+        admin_site = self.admin_site
 
         class _Form(PaymentAllocationForOrderForm):
             def __init__(self2, *args, **kw):
                 kw["order_obj"] = parent_order
+                kw["admin_site"] = admin_site
                 super().__init__(*args, **kw)
 
         kwargs["form"] = _Form
@@ -283,6 +742,15 @@ class OrderAllocationInline(admin.TabularInline):
 #### --------------------------------------
 #### END Accounts Recievable Functionality
 #### --------------------------------------
+# change_view helpers: immutable pickers
+_MONTHS = tuple((i, month_name[i]) for i in range(1, 13))
+
+
+@lru_cache(maxsize=None)
+def _years_around(year):
+    return tuple(range(year - 5, year + 2))
+
+
 class CustomerPaymentInline(admin.TabularInline):
     model = Payment   # from models_ar
     extra = 0
@@ -307,6 +775,7 @@ class CustomerAdmin(admin.ModelAdmin):
         "pending_display",
         "lifetime_in_display",
     )
+    actions = ["download_statements_for_selected"]
     fieldsets = (
         ("Personal Details", {"fields": ("company_name", "contact_name")}),
         ("Company Details", {"fields": ("country", "phone", "email", "address")}),
@@ -387,9 +856,9 @@ class CustomerAdmin(admin.ModelAdmin):
         raise ValueError("Invalid period preset")
     
     # ---------- URLs ----------
-    def get_urls(self):
-        urls = super().get_urls()
-        my_urls = [
+    @cached_property
+    def _custom_urls(self):
+        return [
             # Statement (same template as your billing PDF), but supports arbitrary ranges
             path(
                 "<int:pk>/preview-range/",
@@ -409,7 +878,9 @@ class CustomerAdmin(admin.ModelAdmin):
             ),
 
         ]
-        return my_urls + urls
+
+    def get_urls(self):
+        return self._custom_urls + super().get_urls()
     
     #Live Balance
     @property
@@ -419,38 +890,63 @@ class CustomerAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        return qs.annotate(
-            # Σ ledger deltas (IN − OUT) per customer
-            mat_balance_calc=Coalesce(
-                Sum("material_ledger__delta_kg", output_field=KG),
-                Value(Decimal("0.000"), output_field=KG),
+        # correlated subqueries, not joined Sums: no GROUP BY over customer × ledger rows,
+        # and no fan-out with the balance subqueries added below
+        def ledger_sum(*filters):
+            sq = (
+                CustomerMaterialLedger.objects
+                .filter(*filters, customer_id=OuterRef("pk"))
+                .order_by()
+                .values("customer_id")
+                .annotate(s=Sum("delta_kg"))
+                .values("s")[:1]
             )
-        )
-
+            return Coalesce(Subquery(sq, output_field=KG), Value(Decimal("0.000"), output_field=KG))
 
-    @admin.display(description="Material Balance (kg)")
+        qs = qs.annotate(
+            # Σ ledger deltas (IN − OUT) per customer: (customer, delta_kg) index-only scan
+            mat_balance_calc=ledger_sum(),
+            # Σ IN deltas only (lifetime receipts): partial mat_ledger_pos index
+            lifetime_in_calc=ledger_sum(Q(delta_kg__gt=0)),
+        )
+        # carry_paid_calc / pending_calc (same math as compute_customer_balance_as_of)
+        qs = annotate_customer_balance(qs)
+        # sort key for the carry-forward column (Customer.carry_remaining_pkr reads carry_paid_calc)
+        qs = qs.annotate(carry_remaining_calc=Greatest(
+            F("previous_pending_balance_pkr") - F("carry_paid_calc"), Value(Decimal("0"), output_field=MONEY),
+            output_field=MONEY,
+        ))
+        if _is_changelist(request):
+            # list columns only; address and the statement/Dana settings stay unloaded
+            # (the annotations above still read them in SQL)
+            qs = qs.only("id", "company_name", "contact_name", "previous_pending_balance_pkr")
+        return qs
+
+
+    @admin.display(description="Material Balance (kg)", ordering="mat_balance_calc")
     def material_balance_display(self, obj):
-        val = getattr(obj, "mat_balance_calc", Decimal("0.000")) or Decimal("0.000")
-        return f"{val.quantize(Decimal('0.001')):,.3f}"
+        return _fmt_kg(getattr(obj, "mat_balance_calc", None))
 
 
-    @admin.display(description="Total IN (Lifetime kg)")
+    @admin.display(description="Total IN (Lifetime kg)", ordering="lifetime_in_calc")
     def lifetime_in_display(self, obj):
-        agg = obj.material_ledger.filter(delta_kg__gt=0).aggregate(
-            s=Coalesce(Sum("delta_kg", output_field=KG), Value(Decimal("0.000"), output_field=KG))
-        )
-        val = agg["s"] or Decimal("0.000")
-        return f"{val.quantize(Decimal('0.001')):,.3f}"
+        val = getattr(obj, "lifetime_in_calc", None)
+        if val is None:
+            agg = obj.material_ledger.filter(delta_kg__gt=0).aggregate(
+                s=Coalesce(Sum("delta_kg", output_field=KG), Value(Decimal("0.000"), output_field=KG))
+            )
+            val = agg["s"]
+        return _fmt_kg(val)
 
-    @admin.display(description="Carry-Forward (PKR)")
+    @admin.display(description="Carry-Forward (PKR)", ordering="carry_remaining_calc")
     def carry_forward_display(self, obj):
-        from core.models.common import money_int_pk
-        return money_int_pk(obj.carry_remaining_pkr)
+        return _money_pk(obj.carry_remaining_pkr)
 
-    @admin.display(description="Pending / Credit (PKR)")
+    @admin.display(description="Pending / Credit (PKR)", ordering="pending_calc")
     def pending_display(self, obj):
-        n = compute_customer_balance_as_of(obj)  # always live
-        return f"PKR {n:,}" if n >= 0 else f"PKR {abs(n):,} (credit)"
+        n = getattr(obj, "pending_calc", None)  # annotated in get_queryset
+        n = compute_customer_balance_as_of(obj) if n is None else int(n)
+        return _MONEY(n) if n >= 0 else f"{_MONEY(-n)} (credit)"
     
     
 
@@ -479,16 +975,47 @@ class CustomerAdmin(admin.ModelAdmin):
             from core.utils import generate_customer_monthly_statement as _monthly
             if preset != "month":
                 return HttpResponseBadRequest("Range generator missing. Please add generate_customer_statement_range.")
-            pdf_path = _monthly(pk, y, m, user=request.user)
+            # same content-addressed cache as the range statement (start/end span the month)
+            pdf_path = cached_customer_pdf(
+                "statement_month", pk, start, end,
+                lambda: _monthly(pk, y, m, user=request.user),
+                user=request.user,
+            )
         else:
-            pdf_path = generate_customer_statement_range(pk, start, end, user=request.user)
+            pdf_path = cached_customer_pdf(
+                "statement", pk, start, end,
+                lambda: generate_customer_statement_range(pk, start, end, user=request.user),
+                user=request.user,
+            )
 
-        fname = Path(pdf_path).name
+        return _pdf_response(pdf_path, as_attachment=True, request=request)
+
+    @admin.action(description="Download statements (current month) for selected")
+    def download_statements_for_selected(self, request, queryset):
+        """
+        Render one range statement per selected customer in a single request and zip them.
+        The PDF setup that is shared (site settings, logo image) is paid once, not per click.
+        """
+        from core.utils import generate_customer_statement_range
+
+        try:
+            start, end, _preset, _y, _m = self._compute_range(request)
+        except Exception:
+            today = timezone.localdate()
+            start = date(today.year, today.month, 1)
+            end = date(today.year, today.month, monthrange(today.year, today.month)[1])
+
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            for pk in queryset.values_list("pk", flat=True):
+                pdf_path = generate_customer_statement_range(pk, start, end, user=request.user)
+                zf.write(pdf_path, arcname=Path(pdf_path).name)
+        buf.seek(0)
         return FileResponse(
-            open(pdf_path, "rb"),
+            buf,
             as_attachment=True,
-            filename=fname,
-            content_type="application/pdf",
+            filename=f"statements_{start:%Y%m%d}_{end:%Y%m%d}.zip",
+            content_type="application/zip",
         )
 
     # ---------- Range handlers ----------
@@ -507,14 +1034,20 @@ class CustomerAdmin(admin.ModelAdmin):
             # emulate by calling monthly if preset == month, else bail
             if preset != "month":
                 return HttpResponseBadRequest("Range generator missing. Please add generate_customer_statement_range.")
-            pdf_path = _monthly(pk, y, m, user=request.user)
+            # same content-addressed cache as the range statement (start/end span the month)
+            pdf_path = cached_customer_pdf(
+                "statement_month", pk, start, end,
+                lambda: _monthly(pk, y, m, user=request.user),
+                user=request.user,
+            )
         else:
-            pdf_path = generate_customer_statement_range(pk, start, end, user=request.user)
+            pdf_path = cached_customer_pdf(
+                "statement", pk, start, end,
+                lambda: generate_customer_statement_range(pk, start, end, user=request.user),
+                user=request.user,
+            )
 
-        fname = Path(pdf_path).name
-        resp = FileResponse(open(pdf_path, "rb"), content_type="application/pdf")
-        resp["Content-Disposition"] = f'inline; filename="{fname}"'
-        return resp
+        return _pdf_response(pdf_path, request=request)
     
     def preview_ledger(self, request, pk):
         # Use the unified parser (supports month/year/rolling/custom)
@@ -527,34 +1060,35 @@ class CustomerAdmin(admin.ModelAdmin):
             end_date = date(today.year, today.month, monthrange(today.year, today.month)[1])
 
         from core.utils import generate_customer_ledger_pdf
-        pdf_path = generate_customer_ledger_pdf(pk, start_date, end_date, user=request.user)
+        pdf_path = cached_customer_pdf(
+            "ledger", pk, start_date, end_date,
+            lambda: generate_customer_ledger_pdf(pk, start_date, end_date, user=request.user),
+            user=request.user,
+        )
 
-        fname = Path(pdf_path).name
-        resp = FileResponse(open(pdf_path, "rb"), content_type="application/pdf")
-        resp["Content-Disposition"] = f'inline; filename="{fname}"'
-        return resp
+        return _pdf_response(pdf_path, request=request)
 
     # ---------- Change form extras (adds the Period dropdown + buttons) ----------
     def change_view(self, request, object_id, form_url="", extra_context=None):
         extra_context = extra_context or {}
 
         today = now().date()
-        months = [(i, month_name[i]) for i in range(1, 13)]
-        years = list(range(today.year - 5, today.year + 2))
+        months = _MONTHS
+        years = _years_around(today.year)
 
         default_month = int(request.GET.get("month", today.month))
         default_year = int(request.GET.get("year", today.year))
         default_preset = request.GET.get("preset", "month")
 
         # URLs for the buttons
-        preview_range_url = reverse("admin:core_customer_preview_range", args=[object_id])
-        download_range_url = reverse("admin:core_customer_download_range", args=[object_id])
-        ledger_preview_url = reverse("admin:core_customer_preview_ledger", args=[object_id])
+        preview_range_url = _admin_url("admin:core_customer_preview_range", object_id)
+        download_range_url = _admin_url("admin:core_customer_download_range", object_id)
+        ledger_preview_url = _admin_url("admin:core_customer_preview_ledger", object_id)
 
         # existing quick links
-        cash_ledger_url = reverse("admin:core_payment_changelist") + f"?customer__id__exact={object_id}"
-        material_ledger_url = reverse("admin:core_customermaterialledger_changelist") + f"?customer__id__exact={object_id}"
-        allocation_ledger_url = reverse("admin:core_paymentallocation_changelist") + f"?order__customer__id__exact={object_id}"
+        cash_ledger_url = _changelist_filter_url("admin:core_payment_changelist", "customer__id__exact").format(object_id)
+        material_ledger_url = _changelist_filter_url("admin:core_customermaterialledger_changelist", "customer__id__exact").format(object_id)
+        allocation_ledger_url = _changelist_filter_url("admin:core_paymentallocation_changelist", "order__customer__id__exact").format(object_id)
 
         extra_context.update(
             {
@@ -632,29 +1166,65 @@ class PurchasePaymentInline(admin.TabularInline):
 class RawMaterialTxnAdmin(admin.ModelAdmin):
     list_display = ("when","kind","supplier_name","from_customer","to_customer","qty_kg","rate_display","Total_Amount","supplier_due_display","dc_number")
     list_filter  = ("kind","when","material_type")
+    # nullable FKs: Django's automatic select_related skips them
+    list_select_related = ("from_customer", "to_customer")
     search_fields = ("supplier_name","dc_number","memo","to_customer__company_name","from_customer__company_name")
     autocomplete_fields = ("from_customer","to_customer")
     inlines = (PurchasePaymentInline,)
+    actions = ["mark_selected_as_applied"]
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        # Σ linked supplier payments per purchase in one grouped subquery (no per-row aggregate)
+        paid_sq = (
+            RawMaterialPurchasePayment.objects
+            .filter(purchase_id=OuterRef("pk"))
+            .order_by()
+            .values("purchase_id")
+            .annotate(s=Sum("payment__amount_pkr"))
+            .values("s")[:1]
+        )
+        return qs.annotate(
+            supplier_paid_calc=Coalesce(Subquery(paid_sq, output_field=IntegerField()), Value(0)),
+        ).annotate(
+            # what's still owed on a purchase (never negative): sort key for the Outstanding column
+            supplier_due_calc=Greatest(
+                F("amount_pkr") - F("supplier_paid_calc"), Value(Decimal("0"), output_field=MONEY),
+                output_field=MONEY,
+            ),
+        )
     
     # Keep your server-side safety (apply() calculates and writes ledger)
     def save_model(self, request, obj, form, change):
         obj.apply(user=request.user)
         form.save_m2m()
+
+    @admin.action(description="Re-apply selected to material ledger")
+    def mark_selected_as_applied(self, request, queryset):
+        txns = queryset.select_related("from_customer", "to_customer")
+        try:
+            applied = RawMaterialTxn.apply_many(txns, user=request.user)
+        except ValidationError as e:
+            self.message_user(request, f"Nothing applied: {'; '.join(e.messages)}", level=messages.ERROR)
+            return
+        self.message_user(request, f"Applied {len(applied)} transaction(s) to the ledger.", level=messages.SUCCESS)
     
     @admin.display(description="Rate")
     def rate_display(self, obj):
         return Decimal(obj.rate_pkr)    
-    @admin.display(description="Outstanding (PKR)")
+    @admin.display(description="Outstanding (PKR)", ordering="supplier_due_calc")
     def supplier_due_display(self, obj):
         if obj.kind != RawMaterialTxn.Kind.PURCHASE:
             return "—"
-        return money_int_pk(obj.supplier_outstanding_pkr)
-    @admin.display(description="Total Payment Due (PKR)")
+        # prefer the admin's queryset annotation; fallback to the model property
+        calc = getattr(obj, "supplier_due_calc", None)
+        return _money_pk(obj.supplier_outstanding_pkr if calc is None else calc)
+    @admin.display(description="Total Payment Due (PKR)", ordering="amount_pkr")
     def Total_Amount(self, obj):
         if obj.kind != RawMaterialTxn.Kind.PURCHASE:
             return "—"
         # uses the property we added: amount_pkr - linked supplier payments (never negative)
-        return money_int_pk(obj.amount_pkr)
+        return _money_pk(obj.amount_pkr)
     
     # 1) Add the readonly field only for PURCHASE rows
     def get_readonly_fields(self, request, obj=None):
@@ -675,8 +1245,8 @@ class RawMaterialTxnAdmin(admin.ModelAdmin):
     def purchase_pdf_actions(self, obj):
         if not obj or obj.kind != RawMaterialTxn.Kind.PURCHASE:
             return "—"
-        prev = reverse("admin:core_rawmaterialtxn_preview_pdf", args=[obj.pk])
-        down = reverse("admin:core_rawmaterialtxn_download_pdf", args=[obj.pk])
+        prev = _admin_url("admin:core_rawmaterialtxn_preview_pdf", obj.pk)
+        down = _admin_url("admin:core_rawmaterialtxn_download_pdf", obj.pk)
         return format_html(
             '<a class="button" target="_blank" href="{}">Preview PDF</a>&nbsp;'
             '<a class="button" href="{}">Download PDF</a>',
@@ -684,9 +1254,9 @@ class RawMaterialTxnAdmin(admin.ModelAdmin):
         )
 
     # 4) Admin URLs for the views
-    def get_urls(self):
-        urls = super().get_urls()
-        my = [
+    @cached_property
+    def _custom_urls(self):
+        return [
             path(
                 "<int:pk>/preview-purchase/",
                 self.admin_site.admin_view(self.preview_purchase_pdf),
@@ -698,7 +1268,9 @@ class RawMaterialTxnAdmin(admin.ModelAdmin):
                 name="core_rawmaterialtxn_download_pdf",
             ),
         ]
-        return my + urls
+
+    def get_urls(self):
+        return self._custom_urls + super().get_urls()
 
     # 5) Views that build/serve the PDF
     def preview_purchase_pdf(self, request, pk):
@@ -706,18 +1278,14 @@ class RawMaterialTxnAdmin(admin.ModelAdmin):
             path = generate_rm_purchase_statement(pk, user=request.user)
         except Exception as e:
             return HttpResponseBadRequest(str(e))
-        fname = Path(path).name
-        resp = FileResponse(open(path, "rb"), content_type="application/pdf")
-        resp["Content-Disposition"] = f'inline; filename="{fname}"'
-        return resp
+        return _pdf_response(path, request=request)
 
     def download_purchase_pdf(self, request, pk):
         try:
             path = generate_rm_purchase_statement(pk, user=request.user)
         except Exception as e:
             return HttpResponseBadRequest(str(e))
-        return FileResponse(open(path, "rb"), as_attachment=True,
-                           filename=Path(path).name, content_type="application/pdf")
+        return _pdf_response(path, as_attachment=True, request=request)
          
     class Media:
         # put the JS below at: core/static/core/admin/raw_material_txn.js
@@ -741,55 +1309,86 @@ class SupplierPaymentAdmin(admin.ModelAdmin):
 class PaymentStatusFilter(admin.SimpleListFilter):
     title = 'Payment Status'
     parameter_name = 'payment_status'
+    # built once at import; the filter is a dict lookup per request
+    _LOOKUPS = tuple(reversed(Order.PAYMENT_STATES))  # Fully Paid, Partially Paid, Pending
+    _Q = {code: Q(payment_state=code) for code, _ in Order.PAYMENT_STATES}
 
     def lookups(self, request, model_admin):
-        return [
-            ('full', 'Fully Paid'),
-            ('partial', 'Partially Paid'),
-            ('pending', 'Pending'),
-        ]
+        return self._LOOKUPS
 
     def queryset(self, request, queryset):
-        # queryset here is already annotated via OrderAdmin.get_queryset()
-        val = self.value()
-        if val == 'full':
-            return queryset.filter(total_amount_calc__lte=F('total_paid_calc'))
-        elif val == 'partial':
-            return queryset.filter(Q(total_paid_calc__gt=0) & Q(total_paid_calc__lt=F('total_amount_calc')))
-        elif val == 'pending':
-            return queryset.filter(total_paid_calc=0)
-        return queryset
+        # stored Order.payment_state (kept by signals): indexed equality, no aggregate
+        q = self._Q.get(self.value())
+        return queryset if q is None else queryset.filter(q)
 # -------------------------
 #  MATERIAL
 # -------------------------
 
 @admin.register(MaterialReceipt)
-class MaterialReceiptAdmin(admin.ModelAdmin):
+class MaterialReceiptAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ('customer', 'date', 'bags_count', 'extra_kg', 'total_kg', 'notes')
-    list_filter = ('customer', 'date')
+    list_filter = (('customer', AutocompleteListFilter), 'date')
+    show_full_result_count = False  # skip the unfiltered COUNT(*) next to the filtered one
+    list_select_related = ('customer',)
     search_fields = ('customer__company_name', 'notes')
+    autocomplete_fields = ('customer',)
     date_hierarchy = 'date'
     ordering = ('-date', '-id')
     list_per_page = 50
 
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            # customer column only needs company_name, not the whole customer row
+            qs = qs.select_related("customer").only(
+                "id", "customer_id", "customer__company_name", "date",
+                "bags_count", "extra_kg", "notes",
+            )
+        return qs
+
 @admin.register(CustomerMaterialLedger)
-class CustomerMaterialLedgerAdmin(admin.ModelAdmin):
+class CustomerMaterialLedgerAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display  = ('customer', 'date', 'type', 'delta_kg', 'material_type', 'order', 'receipt', 'memo')
-    list_filter   = ('type', 'customer', 'date', 'material_type')
+    list_filter   = ('type', ('customer', AutocompleteListFilter), 'date', 'material_type')
+    show_full_result_count = False
+    # Order / MaterialReceipt __str__ read their own customer too
+    list_select_related = ('customer', 'order__customer', 'receipt__customer')
+    paginator = EstimatedCountPaginator
     search_fields = ('customer__company_name', 'memo')
+    autocomplete_fields = ('customer', 'order', 'receipt', 'raw_txn')
     date_hierarchy = 'date'
     ordering = ('-date', '-id')
     list_per_page = 50
 
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            # the order/receipt cells are their __str__: load just what those read
+            qs = qs.select_related(*self.list_select_related).only(
+                "id", "customer_id", "customer__company_name", "date", "type", "delta_kg",
+                "material_type", "memo", "order_id", "receipt_id",
+                "order__invoice_number", "order__customer__company_name",
+                "receipt__date", "receipt__material_type", "receipt__is_opening_adjustment",
+                "receipt__bags_count", "receipt__extra_kg", "receipt__customer__company_name",
+            )
+        return qs
+
 
 # -------------------------
 # ORDER
 # -------------------------
 
+def _line_grams(roll_weight, quantity) -> int:
+    """roll_weight (kg, float field) × quantity as int grams; sums stay exact ints."""
+    # cleaned_data/initial already hold float/int: no str()/Decimal()/float() round-trips
+    return round((roll_weight or 0) * 1000) * (quantity or 0)
+
+
 class OrderItemInlineFormSet(forms.BaseInlineFormSet):
     """
     Validates that the customer has enough raw material for the NEW total of this order
     using the inline values submitted in this request (no second save/reopen needed).
+    Only runs where OrderItemInline is used: it is not in OrderAdmin.inlines today.
     """
     def clean(self):
         super().clean()
@@ -802,50 +1401,40 @@ class OrderItemInlineFormSet(forms.BaseInlineFormSet):
             return  # main form will require a customer
 
         # 1) Proposed total kg from the posted rows (ignore DELETE)
-        proposed_total_kg = Decimal('0')
-        for form in self.forms:
-            if not hasattr(form, "cleaned_data"):
-                continue
-            cd = form.cleaned_data
-            if cd.get("DELETE"):
-                continue
-            w = cd.get("roll_weight") or Decimal('0')
-            q = cd.get("quantity") or 0
-            w = w if isinstance(w, Decimal) else Decimal(str(w))
-            q = Decimal(str(q))
-            proposed_total_kg += (w * q)
-
-        # 2) Previously saved total kg for this order (DB)
-        previous_total_kg = Decimal('0')
-        if order.pk:
-            kg_expr = ExpressionWrapper(
-                Coalesce(F('roll_weight'), Value(Decimal('0'))) *
-                Coalesce(F('quantity'), Value(0)),
-                output_field=KG
-            )
-            previous_total_kg = (
-                OrderItem.objects
-                .filter(order=order)
-                .aggregate(total=Coalesce(Sum(kg_expr), Value(Decimal('0'), output_field=KG)))
-            )['total'] or Decimal('0')
+        proposed_g = sum(
+            _line_grams(form.cleaned_data.get("roll_weight"), form.cleaned_data.get("quantity"))
+            for form in self.forms
+            if hasattr(form, "cleaned_data") and not form.cleaned_data.get("DELETE")
+        )
 
-        # 3) Net change requested now
-        delta_kg = proposed_total_kg - previous_total_kg
+        # 2) Previously saved total kg for this order: the formset already loaded every
+        #    saved item; form.initial keeps the stored values (form.instance is overwritten)
+        previous_g = sum(
+            _line_grams(form.initial.get("roll_weight"), form.initial.get("quantity"))
+            for form in self.initial_forms
+        )
+
+        # 3) Net change requested now; unchanged or smaller orders need no ledger read
+        if proposed_g <= previous_g:
+            return
+        delta_kg = Decimal(proposed_g - previous_g) / 1000  # one Decimal, kg with 3 dp
 
-        # 4) Available material (Decimal)
+        # 4) Available material (Decimal), memoized on the customer for this request
+        #    (clean() can run more than once per submit)
         avail_kg = _available_material_kg(customer)
 
-        if delta_kg > 0 and delta_kg > avail_kg:
+        if delta_kg > avail_kg:
             raise ValidationError(
                 f"Not enough raw material to cover this change. "
                 f"Additional needed: {delta_kg:.3f} kg, available: {avail_kg:.3f} kg."
             )
 
-class OrderRollInline(admin.TabularInline):
+class OrderRollInline(InlinePaginationMixin, admin.TabularInline):
     model = OrderRoll
     extra = 1
     fields = ("weight_kg", "barcode", "created_at")
     readonly_fields = ("created_at",)
+    ordering = ("id",)  # rolls in the order they were weighed; stable pages
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
@@ -854,14 +1443,18 @@ class OrderItemInline(admin.TabularInline):
     fields = ("roll_weight", "quantity", "price_per_kg")
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     change_form_template = 'core/order_change_form.html'
     formset = OrderItemInlineFormSet,
-    list_display = ("invoice_number","dcNumber","customer", "status", "grand_total_display", "total_allocated_display", "outstanding_balance_display",  "target_total_kg" ,"produced_kg")
-    list_filter = ("status", "customer")
+    list_display = ("invoice_number","dcNumber","customer", "status", "grand_total_display", "total_allocated_display", "outstanding_balance_display",  "target_total_kg" ,"produced_kg_display")
+    list_filter = ("status", PaymentStatusFilter, ("customer", AutocompleteListFilter))
+    show_full_result_count = False
+    list_select_related = ("customer",)
+    paginator = EstimatedCountPaginator
     search_fields = ("customer__company_name", "invoice_number")
     inlines = [OrderRollInline, OrderAllocationInlineReadonly]
-    actions = ["include_gst_on", "include_gst_off"]
+    autocomplete_fields = ("customer",)
+    actions = ["include_gst_on", "include_gst_off", "download_invoices_for_selected"]
     fieldsets = (
         ("Customer & Terms", {"fields": ("customer", "payment_terms", "delivery_date")}),
          ("Status & Invoice", {"fields": ("status", "invoice_number", "delivery_challan", "delivery_challan_date")}),
@@ -870,12 +1463,41 @@ class OrderAdmin(admin.ModelAdmin):
         
         
     )
-    # @property
-    def total_allocated_pkr(self) -> int:
+    def get_queryset(self, request):
+        # produced_kg_calc / total_paid_calc (subqueries) + grand_total_calc / outstanding_calc:
+        # the money columns and their sorting read these
+        qs = _with_order_totals(super().get_queryset(request))
+        qs = qs.annotate(outstanding_calc=F("grand_total_calc") - F("total_paid_calc"))
+        if _is_changelist(request):
+            # list columns only (money comes from the annotations above)
+            qs = qs.only(
+                "id", "invoice_number", "delivery_challan", "customer_id", "customer__company_name",
+                "status", "target_total_kg", "price_per_kg", "include_gst", "payment_state",
+            )
+        else:
+            # change form: allocations incl. rounding write-off, read by total_allocated_pkr()
+            settled_sq = (
+                PaymentAllocation.objects
+                .filter(order_id=OuterRef("pk"))
+                .values("order_id")
+                .annotate(s=Sum(F("amount") + F("rounding_pkr")))
+                .values("s")[:1]
+            )
+            qs = qs.annotate(total_allocated_pkr_calc=Coalesce(
+                Subquery(settled_sq, output_field=IntegerField()), Value(0, output_field=IntegerField()),
+            ))
+        return qs
+
+    @admin.display(description="Settled (incl. rounding)")
+    def total_allocated_pkr(self, obj) -> int:
         """
         Sum of allocations INCLUDING rounding write-off.
         """
-        agg = self.payment_allocations.aggregate(
+        # prefer the admin's queryset annotation; fallback to live aggregate
+        calc = getattr(obj, "total_allocated_pkr_calc", None)
+        if calc is not None:
+            return int(calc)
+        agg = obj.payment_allocations.aggregate(
             s=Coalesce(
                 Sum(F("amount") + F("rounding_pkr"), output_field=IntegerField()),
                 0,
@@ -885,37 +1507,38 @@ class OrderAdmin(admin.ModelAdmin):
         return int(agg["s"] or 0)
     # Pretty columns
     def subtotal_display(self, obj):
-        return f"{obj.subtotal:,.2f}"
+        return _fmt_pkr2(obj.subtotal_pkr)
     subtotal_display.short_description = "Subtotal"
 
     def tax_display(self, obj):
         # Hide zero tax cleanly
-        return "—" if obj.tax_amount == 0 else f"{obj.tax_amount:,.2f}"
+        tax = obj.tax_amount_pkr
+        return "—" if tax == 0 else _fmt_pkr2(tax)
     tax_display.short_description = "Tax"
 
+    @admin.display(description="Grand Total", ordering="grand_total_calc")
     def grand_total_display(self, obj):
-        return money_int_pk(obj.grand_total)
-    grand_total_display.short_description = "Grand Total"
+        return _money_pk(obj.grand_total_pkr)
 
+    @admin.display(description="Total Paid", ordering="total_paid_calc")
     def total_allocated_display(self, obj):
-        return money_int_pk(obj.total_allocated)
-    total_allocated_display.short_description = "Total Paid"
+        return _money_pk(obj.total_allocated_pkr)
 
     # nice numbers
+    @admin.display(description="Produced kg", ordering="produced_kg_calc")
     def produced_kg_display(self, obj):
-        return f"{obj.produced_kg:,.3f}"
-    produced_kg_display.short_description = "Produced kg"
+        return _fmt_kg(obj.produced_kg)
 
     def billable_kg_display(self, obj):
-        return f"{obj.billable_kg:,.3f}"
+        return _fmt_kg(obj.billable_kg)
     billable_kg_display.short_description = "Billable kg"
 
     def total_amount_display(self, obj):
-        return f"{obj.total_amount:,.2f}"
+        return _fmt_pkr2(obj.total_amount)
     total_amount_display.short_description = "Total Amount"
 
     def total_paid_display(self, obj):
-        return f"{obj.total_paid:,.2f}"
+        return _fmt_pkr2(obj.total_paid_pkr)
     total_paid_display.short_description = "Paid"
 
     @admin.display(description="DC #")
@@ -924,52 +1547,77 @@ class OrderAdmin(admin.ModelAdmin):
     
     
 
+    @admin.display(description="Outstanding", ordering="outstanding_calc")
     def outstanding_balance_display(self, obj):
-        return f"{obj.outstanding_balance:,.2f}"
-    outstanding_balance_display.short_description = "Outstanding"
+        # prefer the admin's queryset annotation; fallback to live math
+        calc = getattr(obj, "outstanding_calc", None)
+        return _fmt_pkr2(obj.outstanding_balance_pkr if calc is None else calc)
 
     @admin.display(description="Status", ordering="status")
     def colored_status(self, obj):
-        code = (obj.status or "").upper()
-        label = obj.get_status_display() if hasattr(obj, "get_status_display") else code
-        s = STATUS_STYLES.get(code, {"bg": "#eee", "fg": "#111", "bd": "#ddd"})
-        # pill style inline so you don't need extra CSS files
-        return format_html(
-            '<span style="display:inline-block;padding:.25rem .5rem;border-radius:999px;'
-            'border:1px solid {bd};background:{bg};color:{fg};font-weight:600;'
-            'font-size:12px;line-height:1;white-space:nowrap;">{label}</span>',
-            bd=s["bd"], bg=s["bg"], fg=s["fg"], label=label
-        )
+        # stored codes are already upper-case: the common path is one dict lookup
+        badge = STATUS_BADGE_HTML.get(obj.status)
+        if badge is None:
+            code = (obj.status or "").upper()
+            # pill style inline so you don't need extra CSS files
+            label = obj.get_status_display() if hasattr(obj, "get_status_display") else code
+            badge = _status_pill(code, label)
+        return badge
     def generate_pdf(self, request, order_id, *args, **kwargs):
         """
         Build (or rebuild) the PDF and stream it to the browser.
         Add ?mode=inline to preview, default is download.
         """
-        pdf_path = Path(generate_invoice(order_id, user=request.user))
+        pdf_path = cached_order_invoice(
+            order_id, lambda: generate_invoice(order_id, user=request.user), user=request.user,
+        )
         mode = request.GET.get('mode', 'download')
+        return _pdf_response(pdf_path, as_attachment=(mode == 'download'), request=request)
+    @admin.action(description="Download invoices for selected orders (ZIP)")
+    def download_invoices_for_selected(self, request, queryset):
+        """
+        One request for N invoices instead of N clicks: unchanged orders reuse their cached
+        PDF, the rest are rendered here in the same process, and everything is zipped.
+        """
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            for order_id in queryset.order_by("pk").values_list("pk", flat=True):
+                pdf_path = cached_order_invoice(
+                    order_id, lambda: generate_invoice(order_id, user=request.user), user=request.user,
+                )
+                zf.write(pdf_path, arcname=Path(pdf_path).name)
+        buf.seek(0)
         return FileResponse(
-            open(pdf_path, 'rb'),
-            as_attachment=(mode == 'download'),
-            filename=pdf_path.name,
-            content_type='application/pdf'
+            buf,
+            as_attachment=True,
+            filename=f"invoices_{timezone.localdate():%Y%m%d}.zip",
+            content_type="application/zip",
         )
+
     def include_gst_on(self, request, queryset):
-        updated = queryset.update(include_gst=True)
+        pks = list(queryset.values_list("pk", flat=True))
+        updated = queryset.update(include_gst=True, updated_at=timezone.now())  # auto_now: PDF cache key
+        refresh_orders_billing(pks)  # .update() fires no Order signals
         self.message_user(request, f"Enabled GST on {updated} orders.")
     include_gst_on.short_description = "Enable GST on selected orders"
 
     def include_gst_off(self, request, queryset):
-        updated = queryset.update(include_gst=False)
+        pks = list(queryset.values_list("pk", flat=True))
+        updated = queryset.update(include_gst=False, updated_at=timezone.now())  # auto_now: PDF cache key
+        refresh_orders_billing(pks)
         self.message_user(request, f"Disabled GST on {updated} orders.")
     include_gst_off.short_description = "Disable GST on selected orders"
     
     def send_email(self, request, order_id, *args, **kwargs):
         """
-        Generate the PDF (to be sure it’s fresh) and email it.
+        Email the invoice PDF (re-rendered only when the order/ledger changed).
         Returns to the order change page with a success/error message.
         """
         try:
-            pdf_path = Path(generate_invoice(order_id, user=request.user))
+            pdf_path = cached_order_invoice(
+                order_id, lambda: generate_invoice(order_id, user=request.user), user=request.user,
+            )
+            # sent in the request: a worker recycle cannot drop it, and the user sees SMTP errors
             send_invoice_email(order_id, pdf_path)
             messages.success(request, "Invoice emailed successfully.")
         except Exception as e:
@@ -982,9 +1630,9 @@ class OrderAdmin(admin.ModelAdmin):
         super().save_related(request, form, formsets, change)
         sync_order_material_ledger(form.instance)
     # Quick status actions in row (optional)
-    def get_urls(self):
-        urls = super().get_urls()
-        my = [
+    @cached_property
+    def _custom_urls(self):
+        return [
             path("<int:order_id>/mark/<str:new_status>/", self.admin_site.admin_view(self.mark_status), name="order-mark-status"),
             path(
                 '<int:order_id>/generate_pdf/',
@@ -997,20 +1645,28 @@ class OrderAdmin(admin.ModelAdmin):
                 name='core_order_send_email'
             ),
         ]
-        return my + urls
+
+    def get_urls(self):
+        return self._custom_urls + super().get_urls()
         
     def mark_status(self, request, order_id, new_status):
+        if new_status not in dict(Order.STATUS_CHOICES):
+            self.message_user(request, "Invalid status.", level=messages.ERROR)
+            return redirect("admin:core_order_change", object_id=order_id)
+        # admin queryset (its scoping applies); clean() only reads produced_kg_calc, which a status change leaves valid
         order = self.get_object(request, order_id)
         if not order:
             self.message_user(request, "Order not found.", level=messages.ERROR)
             return redirect("admin:core_order_changelist")
-        if new_status not in dict(Order.STATUS_CHOICES):
-            self.message_user(request, "Invalid status.", level=messages.ERROR)
-            return redirect("admin:core_order_change", object_id=order_id)
         order.status = new_status
         try:
-            order.full_clean()
-            order.save()
+            # only the status-transition rules (Order.clean), not every field validator;
+            # save() still fires the post_save signals (ledger sync, allocation, pending)
+            order.clean()
+            update_fields = ["status", "updated_at"]
+            if not order.invoice_number:
+                update_fields.append("invoice_number")  # Order.save() fills in a missing number
+            order.save(update_fields=update_fields)
             self.message_user(request, f"Order {order.id} marked {new_status}.", level=messages.SUCCESS)
         except Exception as e:
             self.message_user(request, str(e), level=messages.ERROR)
@@ -1035,33 +1691,44 @@ class ExpenseCategoryAdmin(admin.ModelAdmin):
 @admin.register(Expense)
 class ExpenseAdmin(admin.ModelAdmin):
     list_display = ('title', 'category', 'amount', 'expense_date', 'period')
-    list_filter = ('category', 'period', 'expense_date')
+    list_filter = (('category', admin.RelatedOnlyFieldListFilter), 'period', 'expense_date')
+    list_select_related = ('category',)
     search_fields = ('title', 'notes')
+    autocomplete_fields = ('category',)
     date_hierarchy = 'expense_date'
 
 # -------------------------
 # Employees
 # -------------------------
 
-class AttendanceInline(admin.TabularInline):
+class AttendanceInline(InlinePaginationMixin, admin.TabularInline):
+    # one row per day: page it instead of rendering the employee's whole history
     model = Attendance
     extra = 0
     fields = ('date', 'status', 'hours_worked', 'notes')
     ordering = ('-date',)
 
-class SalaryPaymentInline(admin.TabularInline):
+class SalaryPaymentInline(ProtectedFilesMixin, InlinePaginationMixin, admin.TabularInline):
     model = SalaryPayment
     extra = 0
     fields = ('period_month', 'period_year', 'gross_amount', 'paid_amount', 'payment_date', 'method', 'notes', 'slip')
+    protected_file_urls = {'slip': ('admin:core_salarypayment_slip',)}
     ordering = ('-period_year', '-period_month')
 
 @admin.register(Employee)
-class EmployeeAdmin(admin.ModelAdmin):
+class EmployeeAdmin(ProtectedFilesMixin, admin.ModelAdmin):
     list_display = ('name', 'phone', 'salary', 'join_date', 'contract_end_date', 'is_active')
     actions = ["duplicate_selected"]
     list_filter = ('is_active', 'join_date', 'contract_end_date')
     search_fields = ('name', 'cnic', 'phone', 'email')
-    readonly_fields = ()
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            # address (TEXT) and the file/photo paths are for the change form
+            qs = qs.only("id", "name", "phone", "salary", "join_date", "contract_end_date", "is_active")
+        return qs
+
     fieldsets = (
         ('Identity', {
             'fields': ('name', 'cnic', 'phone', 'email', 'address'),
@@ -1073,16 +1740,38 @@ class EmployeeAdmin(admin.ModelAdmin):
             'fields': ('profile_picture', 'contract_file'),
         }),
     )
-    def get_urls(self):
-        urls = super().get_urls()
-        custom_urls = [
+    EMPLOYEE_FILE_FIELDS = ('profile_picture', 'contract_file')
+    protected_file_urls = {f: ('admin:core_employee_file', f) for f in EMPLOYEE_FILE_FIELDS}
+
+    @cached_property
+    def _custom_urls(self):
+        return [
             path(
                 "<int:employee_id>/duplicate/",
                 self.admin_site.admin_view(self.duplicate_employee),
                 name="core_employee_duplicate",
             ),
+            path(
+                "<int:employee_id>/file/<str:field>/",
+                self.admin_site.admin_view(self.employee_file),
+                name="core_employee_file",
+            ),
         ]
-        return custom_urls + urls
+
+    def get_urls(self):
+        return self._custom_urls + super().get_urls()
+
+    def employee_file(self, request, employee_id, field):
+        """Download for users who may view the employee; sendfile when configured."""
+        if field not in self.EMPLOYEE_FILE_FIELDS:
+            return HttpResponseBadRequest("Unknown file.")
+        employee = get_object_or_404(Employee.objects.only("id", field), pk=employee_id)
+        if not self.has_view_permission(request, employee):
+            raise PermissionDenied
+        ff = getattr(employee, field)
+        if not ff:
+            return HttpResponseBadRequest("No file uploaded.")
+        return _file_response(ff.path, request=request)
     def duplicate_employee(self, request, employee_id):
         employee = get_object_or_404(Employee, pk=employee_id)
         # Create a copy
@@ -1093,25 +1782,56 @@ class EmployeeAdmin(admin.ModelAdmin):
         return redirect("admin:core_employee_change", employee.pk)
 
     def duplicate_selected(self, request, queryset):
-        for obj in queryset:
+        dupes = list(queryset.defer(None))  # full rows: the changelist queryset is only()-narrowed
+        for obj in dupes:
             obj.pk = None
             obj.name = f"{obj.name} (Copy)"
-            obj.save()
-        self.message_user(request, f"{queryset.count()} employee(s) duplicated successfully.", messages.SUCCESS)
+        # one multi-row INSERT (Employee has no save() override or signals)
+        Employee.objects.bulk_create(dupes, batch_size=500)
+        self.message_user(request, f"{len(dupes)} employee(s) duplicated successfully.", messages.SUCCESS)
 
     duplicate_selected.short_description = "Duplicate selected employees"
     inlines = [AttendanceInline, SalaryPaymentInline]
 
 @admin.register(Attendance)
-class AttendanceAdmin(admin.ModelAdmin):
+class AttendanceAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ('employee', 'date', 'status', 'hours_worked', 'notes')
-    list_filter = ('status', 'date', 'employee')
+    list_filter = ('status', 'date', ('employee', AutocompleteListFilter))
+    show_full_result_count = False
+    list_select_related = ('employee',)
     search_fields = ('employee__name', 'notes')
+    autocomplete_fields = ('employee',)
     date_hierarchy = 'date'
 
 @admin.register(SalaryPayment)
-class SalaryPaymentAdmin(admin.ModelAdmin):
+class SalaryPaymentAdmin(ProtectedFilesMixin, AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ('employee', 'period_month', 'period_year', 'gross_amount', 'paid_amount', 'outstanding', 'payment_date', 'method')
-    list_filter = ('period_year', 'period_month', 'method', 'employee')
+    list_filter = ('period_year', 'period_month', 'method', ('employee', AutocompleteListFilter))
+    show_full_result_count = False
+    list_select_related = ('employee',)
     search_fields = ('employee__name',)
+    autocomplete_fields = ('employee',)
     date_hierarchy = 'payment_date'
+    protected_file_urls = {'slip': ('admin:core_salarypayment_slip',)}
+
+    @cached_property
+    def _custom_urls(self):
+        return [
+            path(
+                "<int:payment_id>/slip/",
+                self.admin_site.admin_view(self.salary_slip),
+                name="core_salarypayment_slip",
+            ),
+        ]
+
+    def get_urls(self):
+        return self._custom_urls + super().get_urls()
+
+    def salary_slip(self, request, payment_id):
+        """Slip download for users who may view salary payments (sendfile when configured)."""
+        sp = get_object_or_404(SalaryPayment.objects.only("id", "slip"), pk=payment_id)
+        if not self.has_view_permission(request, sp):
+            raise PermissionDenied
+        if not sp.slip:
+            return HttpResponseBadRequest("No slip uploaded.")
+        return _file_response(sp.slip.path, request=request)
@@ -1,17 +1,50 @@
 from django import forms
+from django.core.cache import cache
 from decimal import Decimal
 
-from core.models.common import money_int_pk
 from core.utils_weight import dkg
 from ..models import Customer, RawMaterialTxn
 
 
+CUSTOMER_OPTIONS_CACHE_KEY = "customers_min_list_v1"
+
+
+def _customer_choices():
+    # <option> labels are company_name only; don't load the A/R / settings columns
+    return Customer.objects.only("id", "company_name").order_by("company_name")
+
+
+def customer_options():
+    """
+    [(pk, company_name)] for the customer <select>s, cached for 5 minutes.
+    core.apps drops the key when a customer is added, renamed or deleted.
+    """
+    return cache.get_or_set(
+        CUSTOMER_OPTIONS_CACHE_KEY,
+        lambda: list(_customer_choices().values_list("id", "company_name")),
+        300,
+    )
+
+
+class _CachedCustomerChoicesMixin:
+    """Render customer selects from customer_options(); the queryset still validates the POST."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = None
+        for field in self.fields.values():
+            if isinstance(field, forms.ModelChoiceField) and field.queryset.model is Customer:
+                if options is None:
+                    options = [("", field.empty_label), *customer_options()]
+                field.choices = options
+
+
 class PurchaseForm(forms.Form):
     supplier_name = forms.CharField(max_length=200, label="Supplier")
     qty_kg = forms.DecimalField(label="Quantity (kg)", min_value=Decimal("0.001"), decimal_places=3)
     rate_pkr = forms.IntegerField(label="Rate (PKR/kg)", min_value=0)
     memo = forms.CharField(required=False, max_length=255)
 
+    # amount_pkr is derived in RawMaterialTxn.clean(), which apply() runs via _full_clean()
     def save(self, user=None):
         txn = RawMaterialTxn(
             kind=RawMaterialTxn.Kind.PURCHASE,
@@ -21,11 +54,10 @@ class PurchaseForm(forms.Form):
             memo=self.cleaned_data.get("memo", ""),
             created_by=user,
         )
-        txn.amount_pkr = money_int_pk(D(txn.rate_pkr) * txn.qty_kg)
         return txn.apply(user=user)
 
-class SellForm(forms.Form):
-    to_customer = forms.ModelChoiceField(queryset=Customer.objects.all())
+class SellForm(_CachedCustomerChoicesMixin, forms.Form):
+    to_customer = forms.ModelChoiceField(queryset=_customer_choices())
     qty_kg = forms.DecimalField(label="Quantity (kg)", min_value=Decimal("0.001"), decimal_places=3)
     rate_pkr = forms.IntegerField(label="Sale Rate (PKR/kg)", min_value=0)
     memo = forms.CharField(required=False, max_length=255)
@@ -39,12 +71,11 @@ class SellForm(forms.Form):
             memo=self.cleaned_data.get("memo", ""),
             created_by=user,
         )
-        txn.amount_pkr = money_int_pk(D(txn.rate_pkr) * txn.qty_kg)
         return txn.apply(user=user)
 
-class TransferForm(forms.Form):
-    from_customer = forms.ModelChoiceField(queryset=Customer.objects.all(), label="From")
-    to_customer   = forms.ModelChoiceField(queryset=Customer.objects.all(), label="To")
+class TransferForm(_CachedCustomerChoicesMixin, forms.Form):
+    from_customer = forms.ModelChoiceField(queryset=_customer_choices(), label="From")
+    to_customer   = forms.ModelChoiceField(queryset=_customer_choices(), label="To")
     qty_kg = forms.DecimalField(label="Quantity (kg)", min_value=Decimal("0.001"), decimal_places=3)
     memo = forms.CharField(required=False, max_length=255)
 
@@ -11,7 +11,15 @@ class SSPAdminSite(AdminSite):
         """
         Django 5.x passes (request, app_label) on app index pages.
         Keep compatibility with older versions too.
+        Memoized per request: each_context() (nav sidebar) and the index view
+        both ask for it, and every build runs the per-model permission checks.
         """
+        memo = request.__dict__.setdefault("_ssp_app_list", {})
+        if app_label not in memo:
+            memo[app_label] = self._build_grouped_app_list(request, app_label)
+        return memo[app_label]
+
+    def _build_grouped_app_list(self, request, app_label=None):
         # Call the parent with/without app_label depending on support
         try:
             app_list = super().get_app_list(request, app_label)  # Django ≥5
@@ -27,10 +35,10 @@ class SSPAdminSite(AdminSite):
         if not core:
             return app_list
 
-        core_models = core["models"]
+        core_models = {m["name"]: m for m in core["models"]}
 
         def pick(name):
-            return next((m for m in core_models if m["name"] == name), None)
+            return core_models.get(name)
 
         buckets = [
             ("Accounting", [
@@ -1,7 +1,7 @@
 # core/apps.py
 from django.apps import AppConfig
 from django.contrib.admin.apps import AdminConfig as DjangoAdminConfig 
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.apps import apps
 
@@ -12,16 +12,32 @@ class CoreConfig(AppConfig):
         import core.services.signals_billing  # noqa
         import core.services.material_sync  # noqa
         from core.services.ar_simple import refresh_customer_pending, auto_allocate_payment, allocate_unapplied_for_customer, FINAL_STATES
+        from core.services.ar_simple import refresh_payment_unapplied, refresh_order_payment_state, refresh_orders_billing
 
 
         Payment = apps.get_model("core","Payment")
         Order   = apps.get_model("core","Order")
+        PaymentAllocation = apps.get_model("core","PaymentAllocation")
+        OrderRoll = apps.get_model("core","OrderRoll")
 
         @receiver(post_save, sender=Payment)
         def _pay_saved(sender, instance, **kwargs):
             auto_allocate_payment(instance.pk, reset_existing=True)
+            refresh_payment_unapplied(instance.pk)  # amount may change with no allocation touched
             refresh_customer_pending(instance.customer_id)
 
+        @receiver(post_save, sender=PaymentAllocation)
+        @receiver(post_delete, sender=PaymentAllocation)
+        def _alloc_changed(sender, instance, **kwargs):
+            refresh_payment_unapplied(instance.payment_id)
+            refresh_order_payment_state(instance.order_id)
+
+        @receiver(post_save, sender=OrderRoll)
+        @receiver(post_delete, sender=OrderRoll)
+        def _roll_changed(sender, instance, **kwargs):
+            # produced kg drives the grand total of final orders
+            refresh_order_payment_state(instance.order_id)
+
         @receiver(post_delete, sender=Payment)
         def _pay_deleted(sender, instance, **kwargs):
             refresh_customer_pending(instance.customer_id)
@@ -31,12 +47,37 @@ class CoreConfig(AppConfig):
             # if the order is final/billable, ensure unapplied cash is used; then refresh pending
             if instance.status in FINAL_STATES:
                 allocate_unapplied_for_customer(instance.customer_id)
+            refresh_order_payment_state(instance.pk)
             refresh_customer_pending(instance.customer_id)
 
+        Customer = apps.get_model("core","Customer")
+        from django.core.cache import cache
+        from core.admin_forms.raw_material import CUSTOMER_OPTIONS_CACHE_KEY
+
+        @receiver(post_save, sender=Customer)
+        @receiver(post_delete, sender=Customer)
+        def _customer_changed(sender, instance, update_fields=None, **kwargs):
+            # the cached <select> list only holds id + company_name
+            if update_fields is None or "company_name" in update_fields:
+                cache.delete(CUSTOMER_OPTIONS_CACHE_KEY)
+
         @receiver(post_delete, sender=Order)
         def _order_deleted(sender, instance, **kwargs):
             refresh_customer_pending(instance.customer_id)
 
+        SiteSettings = apps.get_model("core","SiteSettings")
+
+        @receiver(pre_save, sender=SiteSettings)
+        def _settings_saving(sender, instance, **kwargs):
+            instance._old_tax_rate = (SiteSettings.objects.filter(pk=instance.pk)
+                                      .values_list("tax_rate", flat=True).first())
+
+        @receiver(post_save, sender=SiteSettings)
+        def _settings_saved(sender, instance, created, **kwargs):
+            # the tax rate feeds every GST order's grand total
+            if not created and instance._old_tax_rate != instance.tax_rate:
+                refresh_orders_billing(Order.objects.filter(include_gst=True).values_list("pk", flat=True))
+
 class SSPAdminConfig(DjangoAdminConfig):
     # Use our custom AdminSite class
     default_site = "core.admin_site.SSPAdminSite"
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-16 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_customer_is_cash_customer_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customermaterialledger',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='paymentallocation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
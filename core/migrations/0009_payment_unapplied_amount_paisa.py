@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-16 11:02
+
+from django.db import migrations, models
+
+
+def backfill_unapplied(apps, schema_editor):
+    from django.db.models import BigIntegerField, F, OuterRef, Subquery, Sum, Value
+    from django.db.models.functions import Cast, Coalesce, Round
+
+    Payment = apps.get_model("core", "Payment")
+    PaymentAllocation = apps.get_model("core", "PaymentAllocation")
+    allocated = (
+        PaymentAllocation.objects
+        .filter(payment_id=OuterRef("pk"))
+        .values("payment_id")
+        .annotate(s=Sum("amount"))
+        .values("s")[:1]
+    )
+    Payment.objects.update(
+        unapplied_amount_paisa=Cast(
+            Round((F("amount") - Coalesce(Subquery(allocated), Value(0))) * Value(100)),
+            output_field=BigIntegerField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_customermaterialledger_updated_at_order_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='unapplied_amount_paisa',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_unapplied, migrations.RunPython.noop),
+    ]
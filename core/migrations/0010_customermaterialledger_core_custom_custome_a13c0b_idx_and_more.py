@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-16 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_payment_unapplied_amount_paisa'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customermaterialledger',
+            index=models.Index(fields=['customer', 'delta_kg'], name='core_custom_custome_a13c0b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customermaterialledger',
+            index=models.Index(condition=models.Q(('delta_kg__gt', 0)), fields=['customer'], name='mat_ledger_pos'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['customer', 'received_on'], name='core_paymen_custome_cbc1c2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentallocation',
+            index=models.Index(fields=['payment', 'amount'], name='core_paymen_payment_1e238b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentallocation',
+            index=models.Index(fields=['order', 'amount'], name='core_paymen_order_i_e339e2_idx'),
+        ),
+    ]
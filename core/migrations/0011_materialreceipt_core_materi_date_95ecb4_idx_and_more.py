@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-16 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_customermaterialledger_core_custom_custome_a13c0b_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='materialreceipt',
+            index=models.Index(fields=['-date', '-id'], name='core_materi_date_95ecb4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='materialreceipt',
+            index=models.Index(fields=['customer', '-date'], name='core_materi_custome_ea9207_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customermaterialledger',
+            index=models.Index(fields=['-date', '-id'], name='core_custom_date_6b28c7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customermaterialledger',
+            index=models.Index(fields=['customer', '-date'], name='core_custom_custome_f984a1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'customer'], name='core_order_status_03523c_idx'),
+        ),
+    ]
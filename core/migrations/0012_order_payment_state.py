@@ -0,0 +1,65 @@
+# Generated by Django 5.2.5 on 2026-10-16 12:45
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import migrations, models
+
+FINAL_STATES = ("READY", "DELIVERED", "CLOSED")
+
+
+def backfill_payment_state(apps, schema_editor):
+    """Same math as Order.compute_payment_state (grand_total_pkr vs total_allocated_pkr)."""
+    from django.db.models import OuterRef, Subquery, Sum
+
+    Order = apps.get_model("core", "Order")
+    OrderRoll = apps.get_model("core", "OrderRoll")
+    PaymentAllocation = apps.get_model("core", "PaymentAllocation")
+    SiteSettings = apps.get_model("core", "SiteSettings")
+
+    ss = SiteSettings.objects.first()
+    if ss is not None and ss.tax_rate is not None:
+        ratio = Decimal(str(ss.tax_rate)) / Decimal("100")
+    else:
+        ratio = Decimal(str(getattr(settings, "TAX_RATE", 0) or 0))
+
+    produced = (OrderRoll.objects.filter(order_id=OuterRef("pk"))
+                .values("order_id").annotate(s=Sum("weight_kg")).values("s")[:1])
+    paid = (PaymentAllocation.objects.filter(order_id=OuterRef("pk"))
+            .values("order_id").annotate(s=Sum("amount")).values("s")[:1])
+
+    buckets = {"pending": [], "partial": [], "full": []}
+    rows = (Order.objects
+            .annotate(produced_s=Subquery(produced), paid_s=Subquery(paid))
+            .values_list("pk", "status", "target_total_kg", "price_per_kg", "include_gst",
+                         "produced_s", "paid_s"))
+    for pk, status, target, price, gst, produced_s, paid_s in rows:
+        kg = produced_s if status in FINAL_STATES else target
+        kg = Decimal(str(kg or 0)).quantize(Decimal("0.001"), rounding=ROUND_HALF_UP)
+        subtotal = int((kg * Decimal(str(price or 0))).quantize(Decimal("1")))
+        tax = int((Decimal(subtotal) * ratio).quantize(Decimal("1"))) if gst else 0
+        total, paid_i = subtotal + tax, int(paid_s or 0)
+        if total <= paid_i:
+            buckets["full"].append(pk)
+        else:
+            buckets["partial" if paid_i > 0 else "pending"].append(pk)
+
+    for state, pks in buckets.items():
+        if pks:
+            Order.objects.filter(pk__in=pks).update(payment_state=state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_materialreceipt_core_materi_date_95ecb4_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='payment_state',
+            field=models.CharField(choices=[('pending', 'Pending'), ('partial', 'Partially Paid'), ('full', 'Fully Paid')], db_index=True, default='pending', editable=False, max_length=8),
+        ),
+        migrations.RunPython(backfill_payment_state, migrations.RunPython.noop),
+    ]
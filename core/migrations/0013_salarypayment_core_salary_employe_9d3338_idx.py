@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-16 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_order_payment_state'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='salarypayment',
+            index=models.Index(fields=['employee', '-period_year', '-period_month'], name='core_salary_employe_9d3338_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-16 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_salarypayment_core_salary_employe_9d3338_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customermaterialledger',
+            index=models.Index(fields=['customer', 'date', 'delta_kg'], name='core_custom_custome_505241_idx'),
+        ),
+    ]
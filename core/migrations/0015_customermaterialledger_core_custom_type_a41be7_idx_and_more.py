@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-16 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_customermaterialledger_core_custom_custome_505241_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customermaterialledger',
+            index=models.Index(fields=['type', '-date', '-id'], name='core_custom_type_a41be7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salarypayment',
+            index=models.Index(fields=['-period_year', '-period_month'], name='core_salary_period__56e743_idx'),
+        ),
+    ]
@@ -21,6 +21,12 @@ class SalaryPayment(models.Model):
     class Meta:
         unique_together = ('employee', 'period_month', 'period_year')
         ordering = ['-period_year', '-period_month']
+        indexes = [
+            # employee page inline: WHERE employee_id = ? ORDER BY year DESC, month DESC
+            models.Index(fields=['employee', '-period_year', '-period_month']),
+            # changelist default ordering across all employees
+            models.Index(fields=['-period_year', '-period_month']),
+        ]
 
     @property
     def outstanding(self) -> int:
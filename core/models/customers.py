@@ -7,6 +7,7 @@ from django.conf import settings
 from core.models.common import money_int_pk
 from core.utils_money import to_rupees_int
 from django.apps import apps
+from django.utils.functional import cached_property
 
 
 # You already have FINAL_STATES in models_ar
@@ -70,28 +71,37 @@ class Customer(models.Model):
         default=True,
         help_text="If unticked, hide Material Movements / Balance for this customer.",
     )
-    @property
+    @cached_property
     def carry_remaining_pkr(self) -> int:
         """
         Display-only: treat all positive payments as reducing carry-forward first.
-        Returns max(carry − sum(positive payments), 0).
+        Returns max(carry − sum(positive payments), 0). Memoized per instance.
         """
         from core.models_ar import Payment
         from core.utils_money import to_rupees_int as _toint
 
         carry = int(self.previous_pending_balance_pkr or 0)
-        # sum ONLY positive payments (ignore refunds which are negative)
-        paid = 0
-        for p in Payment.objects.filter(customer=self).only("amount"):
-            n = _toint(p.amount)
-            if n > 0:
-                paid += n
+        # prefer the admin's queryset annotation; fallback to live sum
+        paid = getattr(self, "carry_paid_calc", None)
+        if paid is not None:
+            paid = int(paid)
+        else:
+            # sum ONLY positive payments (ignore refunds which are negative)
+            paid = 0
+            for p in Payment.objects.filter(customer=self).only("amount"):
+                n = _toint(p.amount)
+                if n > 0:
+                    paid += n
         remaining = carry - paid
         return remaining if remaining > 0 else 0
 
-    @property 
+    @cached_property
     def material_balance_kg(self) -> Decimal: 
-        """ Net KG = sum of ledger deltas (IN minus OUT), quantified to 3 dp. """ 
+        """ Net KG = sum of ledger deltas (IN minus OUT), quantified to 3 dp. Memoized per instance. """ 
+        # prefer the admin's queryset annotation; fallback to live aggregate
+        calc = getattr(self, "mat_balance_calc", None)
+        if calc is not None:
+            return Decimal(calc).quantize(Decimal("0.001"))
         KG = DecimalField(max_digits=12, decimal_places=3) 
         agg = self.material_ledger.aggregate( 
             s=Coalesce(Sum("delta_kg", output_field=KG), 
@@ -113,24 +123,26 @@ class Customer(models.Model):
     #     return val
 
     # ---- Pending balance (live compute fallback) ----
-    @property
+    @cached_property
     def pending_balance_live_pkr(self) -> int:
         """
         Live calculation (no stored field needed):
         carry + sum(final orders) − sum(payments), in whole rupees.
+        Memoized per instance; save() drops the memo.
         """
         FINAL_STATES = ("READY", "DELIVERED", "CLOSED")
         Order   = apps.get_model("core", "Order")
         Payment = apps.get_model("core", "Payment")
 
-        # Sum of final/billable orders in PKR-int
-        charges = sum(int(getattr(o, "grand_total_pkr", 0) or 0)
-                      for o in Order.objects.filter(customer=self, status__in=FINAL_STATES))
-
-        # Sum of all payments received (convert Decimal → int rupees)
         # Avoid importing helpers at module import time to prevent circulars.
+        from core.utils_billing import orders_grand_total_pkr
         from core.utils_money import to_rupees_int as _toint
-        payments = sum(_toint(p.amount) for p in Payment.objects.filter(customer=self))
+
+        # Sum of final/billable orders in PKR-int (one aggregate)
+        charges = orders_grand_total_pkr(Order.objects.filter(customer=self, status__in=FINAL_STATES))
+
+        # Sum of all payments received (convert Decimal → int rupees), amounts only
+        payments = sum(_toint(a) for a in Payment.objects.filter(customer=self).values_list("amount", flat=True))
 
         carry = int(self.previous_pending_balance_pkr or 0)
         return carry + int(charges) - int(payments)
@@ -141,11 +153,18 @@ class Customer(models.Model):
         Recalculate and (optionally) store into pending_balance_pkr.
         Returns the new pending (int).
         """
+        self.__dict__.pop("pending_balance_live_pkr", None)  # always recompute here
         val = self.pending_balance_live_pkr
         if save:
             self.pending_balance_pkr = int(val)
             self.save(update_fields=["pending_balance_pkr"])
         return int(val)
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # invalidate the memoized live balances
+        for name in ("pending_balance_live_pkr", "carry_remaining_pkr", "material_balance_kg"):
+            self.__dict__.pop(name, None)
+
     def __str__(self):
         return self.company_name
\ No newline at end of file
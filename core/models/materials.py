@@ -57,6 +57,11 @@ class MaterialReceipt(models.Model):
         return f"{self.customer.company_name} · {self.date}{mt}{tag} · {self.total_kg} kg"
 
     class Meta:
+        indexes = [
+            # admin changelist ordering (-date, -id), optionally narrowed to one customer
+            models.Index(fields=["-date", "-id"]),
+            models.Index(fields=["customer", "-date"]),
+        ]
         verbose_name = "Material Receipt"
         verbose_name_plural = "Material Receipts"
 
@@ -86,6 +91,7 @@ class CustomerMaterialLedger(models.Model):
     type     = models.CharField(max_length=3, choices=EntryType.choices)
     delta_kg = models.DecimalField(max_digits=12, decimal_places=3, default=Decimal("0.000"))
     memo     = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     raw_txn = models.ForeignKey(
         "core.RawMaterialTxn",  # adjust app label if different
@@ -109,6 +115,19 @@ class CustomerMaterialLedger(models.Model):
                 condition=Q(raw_txn__isnull=False),
             ),
         ]
+        indexes = [
+            # Σ delta_kg per customer (balances) without touching the heap
+            models.Index(fields=["customer", "delta_kg"]),
+            # lifetime IN (delta_kg > 0) per customer; partial where supported (PostgreSQL/SQLite)
+            models.Index(fields=["customer"], name="mat_ledger_pos", condition=Q(delta_kg__gt=0)),
+            # admin changelist ordering (-date, -id), optionally narrowed to one customer
+            models.Index(fields=["-date", "-id"]),
+            models.Index(fields=["customer", "-date"]),
+            # changelist filtered by IN/OUT (list_filter "type") in the same (-date, -id) order
+            models.Index(fields=["type", "-date", "-id"]),
+            # statement period sums (customer, date range, IN/OUT by sign) as index-only scans
+            models.Index(fields=["customer", "date", "delta_kg"]),
+        ]
        
         verbose_name = "Ledger"
         verbose_name_plural = "Ledgers"
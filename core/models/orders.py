@@ -42,6 +42,17 @@ except Exception:
 
 D = Decimal  # convenience
 
+
+def site_tax_ratio(ss=None) -> Decimal:
+    """GST ratio from Site Settings (17.00 → 0.17); falls back to settings.TAX_RATE."""
+    try:
+        ss = ss or get_site_settings()
+        if ss and ss.tax_rate is not None:
+            return (D(ss.tax_rate) / D("100"))
+    except Exception:
+        pass
+    return D(str(getattr(settings, "TAX_RATE", 0) or 0))
+
 class Order(models.Model):
     save_on_top = True
     STATUS_CHOICES = [
@@ -97,6 +108,23 @@ class Order(models.Model):
         max_digits=6, decimal_places=3, default=Decimal("0.500"),
         help_text="Allowed diff between produced and target at READY/DELIVERED/CLOSED"
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    PAYMENT_STATES = [
+        ("pending", "Pending"),
+        ("partial", "Partially Paid"),
+        ("full", "Fully Paid"),
+    ]
+    # Auto: grand total vs Σ allocations, kept by signals (see ar_simple.refresh_order_payment_state)
+    payment_state = models.CharField(
+        max_length=8, choices=PAYMENT_STATES, default="pending", db_index=True, editable=False,
+    )
+
+    class Meta:
+        indexes = [
+            # admin status filter, alone or together with the customer filter
+            models.Index(fields=["status", "customer"]),
+        ]
 
     # ----------------- Derived amounts (kg) -----------------
     @property
@@ -104,6 +132,10 @@ class Order(models.Model):
         """Sum of produced roll weights for this order (uses related_name='rolls')."""
         if self._state.adding or not self.pk:
             return Decimal("0.000")
+        # prefer the admin's queryset annotation; fallback to live aggregate
+        calc = getattr(self, "produced_kg_calc", None)
+        if calc is not None:
+            return dkg(calc)
         agg = self.rolls.aggregate(s=Sum("weight_kg"))
         return dkg(agg["s"])
 
@@ -137,17 +169,16 @@ class Order(models.Model):
         """Tax ratio as Decimal (e.g., 0.17)."""
         if not self.include_gst:
             return D("0")
-        try:
-            ss = get_site_settings()
-            if ss and ss.tax_rate is not None:
-                return (D(ss.tax_rate) / D("100"))
-        except Exception:
-            pass
-        return D(str(getattr(settings, "TAX_RATE", 0) or 0))
+        return site_tax_ratio()
 
     @property
     def tax_amount_pkr(self) -> int:
         """Canonical: tax as PKR int (derived from subtotal * tax_rate_ratio)."""
+        # grand_total_calc is round(subtotal) + round(tax) in SQL, so the difference is
+        # exact and skips the Site Settings lookup behind tax_rate_ratio on annotated rows
+        calc = getattr(self, "grand_total_calc", None)
+        if calc is not None:
+            return int(calc) - int(self.subtotal_pkr)
         # Use Decimal math to apply % to a rupee value, then convert back to int.
         tax = D(self.subtotal_pkr) * self.tax_rate_ratio
         return _to_pkr_int(tax)
@@ -155,6 +186,10 @@ class Order(models.Model):
     @property
     def grand_total_pkr(self) -> int:
         """Canonical: grand total (PKR int)."""
+        # prefer the admin's queryset annotation; fallback to live math
+        calc = getattr(self, "grand_total_calc", None)
+        if calc is not None:
+            return int(calc)
         return int(self.subtotal_pkr) + int(self.tax_amount_pkr)
 
     @property
@@ -163,6 +198,10 @@ class Order(models.Model):
         Canonical: allocated/paid-to-this-order as PKR int.
         Assumes payment_allocations.amount is a money value (Decimal).
         """
+        # prefer the admin's queryset annotation; fallback to live aggregate
+        calc = getattr(self, "total_paid_calc", None)
+        if calc is not None:
+            return _to_pkr_int(calc)
         agg = self.payment_allocations.aggregate(s=Sum("amount"))
         return _to_pkr_int(agg["s"] or 0)
 
@@ -176,6 +215,13 @@ class Order(models.Model):
         """Canonical: outstanding = grand_total_pkr - total_allocated_pkr."""
         return int(self.grand_total_pkr) - int(self.total_allocated_pkr)
 
+    def compute_payment_state(self) -> str:
+        """'full' once allocations cover the grand total, 'partial' when anything is paid."""
+        paid = int(self.total_allocated_pkr)
+        if int(self.grand_total_pkr) <= paid:
+            return "full"
+        return "partial" if paid > 0 else "pending"
+
     # ----------------- Display helpers (keep UI formatting in one place) -----------------
     @property
     def subtotal_display(self) -> str:
@@ -16,6 +16,9 @@ from core.utils_weight import dkg  # returns Decimal with 3dp
 BAG_WEIGHT_KG        = Decimal("25.000")  # display only
 BAG_PRICE_CONSTANT   = Decimal("55")      # your business constant (not kg)
 
+COMPANY_STOCK_NAME = "__COMPANY_STOCK__"
+_COMPANY_STOCK_PK = None  # memo for RawMaterialTxn.company_stock_customer()
+
 # Keep methods simple (no import from AR payments to avoid mixing A/R & A/P)
 SUPPLIER_PAYMENT_METHODS = [
     ("CASH", "Cash"),
@@ -25,6 +28,11 @@ SUPPLIER_PAYMENT_METHODS = [
 ]
 
 
+def _remember_company_stock(pk):
+    global _COMPANY_STOCK_PK
+    _COMPANY_STOCK_PK = pk
+
+
 def _ledger_dt_for(date_field):
     """
     Use the txn 'when' (DateField) as the ledger DateTime so PDF/month filters
@@ -115,11 +123,22 @@ class RawMaterialTxn(models.Model):
         """
         Single sentinel 'customer' that represents company-owned stock.
         We key strictly by company_name to avoid dupes.
+        Looked up once per process: only the pk is memoized, and every call gets its own
+        instance (other fields deferred), so per-instance caches never leak between txns.
         """
-        obj, _ = Customer.objects.get_or_create(
-            company_name="__COMPANY_STOCK__",
+        if _COMPANY_STOCK_PK is not None:
+            return Customer.from_db(
+                Customer.objects.db, ["id", "company_name"], [_COMPANY_STOCK_PK, COMPANY_STOCK_NAME],
+            )
+        obj, created = Customer.objects.get_or_create(
+            company_name=COMPANY_STOCK_NAME,
             defaults={"country": "Pakistan"},  # keep it human-readable; no ISO coercion
         )
+        if created:
+            # a rolled-back create must not leave a dangling pk in the memo
+            transaction.on_commit(lambda: _remember_company_stock(obj.pk))
+        else:
+            _remember_company_stock(obj.pk)
         return obj
 
     # ---- Validation & normalization ---------------------------------------
@@ -168,71 +187,138 @@ class RawMaterialTxn(models.Model):
             
 
 
-    @transaction.atomic
-    def apply(self, user=None):
-        self.full_clean()
-
-        if user and not self.created_by_id:
-            self.created_by = user
-        self.save()  # ensure self.pk exists
-
+    def _ledger_entries(self, company=None):
+        """
+        (customer, entry_type, delta_kg, memo) rows this txn must own in the ledger.
+        Keyed by (raw_txn, customer, type) — see uniq_per_rawtxn_customer_type.
+        """
         kg = dkg(self.qty_kg)
-        ledger_dt = _ledger_dt_for(self.when)  # your helper using DateField 'when'
-
-        def upsert(customer, entry_type, delta, memo):
-            L.objects.update_or_create(
-                raw_txn=self,                  # <— key
-                customer=customer,             # <— key
-                type=entry_type,               # <— key
-                defaults=dict(
-                    order=None,
-                    receipt=None,
-                    date=ledger_dt,
-                    delta_kg=delta,
-                    material_type=self.material_type,
-                    memo=memo,
-                ),
-            )
+        company = company or self.company_stock_customer()
 
         if self.kind == self.Kind.PURCHASE:
-            upsert(
-                self.company_stock_customer(),
+            return [(
+                company,
                 L.EntryType.IN,
                 kg,
                 f"RM TXN #{self.pk} · Purchase from {self.supplier_name} · {self.material_type} · {self.qty_kg} kg",
-            )
-
-        elif self.kind == self.Kind.SALE:
-            comp = self.company_stock_customer()
-            upsert(
-                comp,
-                L.EntryType.OUT,
-                -kg,
-                f"RM TXN #{self.pk} · Sale to {self.to_customer.company_name} · {self.material_type} · {self.qty_kg} kg",
-            )
-            upsert(
-                self.to_customer,
-                L.EntryType.IN,
-                kg,
-                f"RM TXN #{self.pk} · From Company Stock · {self.material_type} · {self.qty_kg} kg",
-            )
+            )]
+
+        if self.kind == self.Kind.SALE:
+            return [
+                (
+                    company,
+                    L.EntryType.OUT,
+                    -kg,
+                    f"RM TXN #{self.pk} · Sale to {self.to_customer.company_name} · {self.material_type} · {self.qty_kg} kg",
+                ),
+                (
+                    self.to_customer,
+                    L.EntryType.IN,
+                    kg,
+                    f"RM TXN #{self.pk} · From Company Stock · {self.material_type} · {self.qty_kg} kg",
+                ),
+            ]
 
-        else:  # TRANSFER
-            upsert(
+        # TRANSFER
+        return [
+            (
                 self.from_customer,
                 L.EntryType.OUT,
                 -kg,
                 f"RM TXN #{self.pk} · Transfer → {self.to_customer.company_name} · {self.material_type} · {self.qty_kg} kg",
-            )
-            upsert(
+            ),
+            (
                 self.to_customer,
                 L.EntryType.IN,
                 kg,
                 f"RM TXN #{self.pk} · Transfer ← {self.from_customer.company_name} · {self.material_type} · {self.qty_kg} kg",
-            )
+            ),
+        ]
+
+    # FK existence is enforced by the DB (and was checked by the form that picked them);
+    # Field.validate on a FK is a SELECT each. No unique fields besides the pk.
+    _CLEAN_EXCLUDE = ("from_customer", "to_customer", "created_by")
+
+    def _full_clean(self):
+        self.full_clean(exclude=self._CLEAN_EXCLUDE, validate_unique=False)
+
+    @transaction.atomic
+    def apply(self, user=None):
+        self._full_clean()
+
+        if user and not self.created_by_id:
+            self.created_by = user
+        self.save()  # ensure self.pk exists
 
+        # clean() already resolved the company stock endpoint for purchase/sale
+        company = {
+            self.Kind.PURCHASE: self.to_customer,
+            self.Kind.SALE: self.from_customer,
+        }.get(self.kind)
+        # one SELECT for this txn's ledger rows + one bulk write (not get/save per row)
+        self._sync_ledger([self], company)
         return self
 
+    @classmethod
+    @transaction.atomic
+    def apply_many(cls, txns, user=None):
+        """
+        Batched .apply() for saved txns: same validation and ledger rows, but one
+        bulk_update for the txns and one bulk_create / bulk_update for the ledger.
+        """
+        txns = list(txns)
+        if not txns:
+            return txns
+
+        for t in txns:
+            t._full_clean()
+            if user and not t.created_by_id:
+                t.created_by = user
+        # fields clean() may normalize
+        cls.objects.bulk_update(
+            txns, ["from_customer", "to_customer", "qty_kg", "amount_pkr", "created_by"]
+        )
+        cls._sync_ledger(txns)
+        return txns
+
+    @classmethod
+    def _sync_ledger(cls, txns, company=None):
+        """
+        Upsert the ledger rows of saved txns, keyed by (raw_txn, customer, type):
+        one SELECT of the existing rows, then one bulk_create and/or bulk_update.
+        """
+        company = company or cls.company_stock_customer()
+        now = timezone.now()
+        existing = {
+            (row.raw_txn_id, row.customer_id, row.type): row
+            for row in L.objects.filter(raw_txn__in=txns)
+        }
+        to_create, to_update = [], []
+        for t in txns:
+            ledger_dt = _ledger_dt_for(t.when)
+            for customer, entry_type, delta, memo in t._ledger_entries(company):
+                row = existing.get((t.pk, customer.pk, entry_type))
+                if row is None:
+                    row = L(raw_txn=t, customer=customer, type=entry_type)
+                    to_create.append(row)
+                else:
+                    to_update.append(row)
+                row.order = None
+                row.receipt = None
+                row.date = ledger_dt
+                row.delta_kg = delta
+                row.material_type = t.material_type
+                row.memo = memo
+                row.updated_at = now  # bulk_update skips auto_now
+
+        if to_create:
+            L.objects.bulk_create(to_create)
+        if to_update:
+            L.objects.bulk_update(
+                to_update,
+                ["order", "receipt", "date", "delta_kg", "material_type", "memo", "updated_at"],
+            )
+
     # ---- Supplier A/P helpers (for PURCHASE) ------------------------------
     @property
     def supplier_paid_pkr(self) -> int:
@@ -241,6 +327,10 @@ class RawMaterialTxn(models.Model):
         """
         if self.kind != self.Kind.PURCHASE:
             return 0
+        # prefer the admin's queryset annotation; fallback to live aggregate
+        calc = getattr(self, "supplier_paid_calc", None)
+        if calc is not None:
+            return int(calc)
         return int(self.linked_payments.aggregate(s=Sum("payment__amount_pkr"))["s"] or 0)
 
     @property
@@ -6,10 +6,11 @@ from django.core.exceptions import ValidationError
 from django.db.models import Sum, Value, IntegerField, F
 from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.functional import cached_property
 
 from core.models.common import BANK_NAMES
 
-from .utils_money import D, to_rupees_int, money_mul, round_to
+from .utils_money import D, to_rupees_int, money_mul, round_to, fmt_paisa
 from .utils_weight import dkg 
 
 PAYMENT_METHODS = [
@@ -29,19 +30,38 @@ class Payment(models.Model):
     reference = models.CharField(max_length=64, blank=True)  # cheque no., bank ref, etc.
     amount = models.DecimalField(max_digits=12, decimal_places=2)  # positive for receipt; negative for refund
     notes = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Auto: (amount − Σ allocations) in paisa, kept by signals (see ar_simple.refresh_payment_unapplied)
+    unapplied_amount_paisa = models.BigIntegerField(default=0, db_index=True, editable=False)
 
     class Meta:
         ordering = ["-received_on", "-id"]
+        indexes = [
+            models.Index(fields=["customer", "received_on"]),
+        ]
         verbose_name = "Receive Payment"
         verbose_name_plural = "Receive Payments"
 
     def __str__(self):
-        return f"{self.received_on} – Unapplied Rs. {self.unapplied_amount:,.2f} PKR / Total Rs. {self.amount:,.2f} PKR – {self.customer}"
-
-    @property
+        # stored column for saved rows: no aggregate per <option> / autocomplete result
+        if self.pk:
+            unapplied = self.unapplied_amount_paisa
+        else:
+            unapplied = int(self.unapplied_amount * 100)
+        total = int((self.amount or 0) * 100)
+        return f"{self.received_on} – Unapplied Rs. {fmt_paisa(unapplied)} PKR / Total Rs. {fmt_paisa(total)} PKR – {self.customer}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.__dict__.pop("allocated_amount", None)  # amount/allocations may have moved
+
+    @cached_property
     def allocated_amount(self) -> Decimal:
-        agg = self.allocations.aggregate(s=Sum("amount"))
-        return round_to(agg["s"] or 0)
+        # prefer the admin's queryset annotation; fallback to live aggregate (memoized)
+        calc = getattr(self, "allocated_calc", None)
+        if calc is None:
+            calc = self.allocations.aggregate(s=Sum("amount"))["s"]
+        return round_to(calc or 0)
 
     @property
     def unapplied_amount(self) -> Decimal:
@@ -64,9 +84,15 @@ class PaymentAllocation(models.Model):
         default=0,
         help_text="Small +/- write-off used to settle the order (± few rupees).",
     )
+    updated_at   = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = [("payment", "order")]
+        indexes = [
+            # Σ amount grouped by payment / by order → index-only scans
+            models.Index(fields=["payment", "amount"]),
+            models.Index(fields=["order", "amount"]),
+        ]
         verbose_name = "Payments Ledger"
         verbose_name_plural = "Payments Ledger"
 
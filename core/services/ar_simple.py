@@ -14,12 +14,59 @@ def _Customer():         return apps.get_model("core","Customer")
 def refresh_customer_pending(customer_id: int):
     """pending = carry + sum(final orders) − sum(payments). No monthly complexity."""
     Order = _Order(); Payment = _Payment(); Customer = _Customer()
-    c = Customer.objects.get(pk=customer_id)
-    charges = sum(int(getattr(o,"grand_total_pkr",0) or 0)
-                  for o in Order.objects.filter(customer=c, status__in=FINAL_STATES))
-    payments = sum(_toint(p.amount) for p in Payment.objects.filter(customer=c))
-    c.pending_balance_pkr = int(c.previous_pending_balance_pkr or 0) + int(charges) - int(payments)
-    c.save(update_fields=["pending_balance_pkr"])
+    # only the carry column is needed; no full Customer row / save() round-trip
+    carry = (Customer.objects.filter(pk=customer_id)
+             .values_list("previous_pending_balance_pkr", flat=True).first())
+    if carry is None:  # column is NOT NULL, so None means no such customer
+        raise Customer.DoesNotExist(f"Customer {customer_id} does not exist.")
+    from core.utils_billing import orders_grand_total_pkr
+    charges = orders_grand_total_pkr(Order.objects.filter(customer_id=customer_id, status__in=FINAL_STATES))
+    payments = sum(_toint(a) for a in Payment.objects.filter(customer_id=customer_id)
+                   .values_list("amount", flat=True))
+    Customer.objects.filter(pk=customer_id).update(
+        pending_balance_pkr=int(carry or 0) + int(charges) - int(payments)
+    )
+
+def refresh_payment_unapplied(payment_id: int):
+    """unapplied_amount_paisa = (amount − Σ allocations) × 100, in one UPDATE."""
+    from django.db.models import BigIntegerField, F, OuterRef, Subquery, Value
+    from django.db.models.functions import Cast, Coalesce, Round
+
+    Payment = _Payment(); PaymentAllocation = _PaymentAllocation()
+    allocated = (PaymentAllocation.objects
+                 .filter(payment_id=OuterRef("pk"))
+                 .values("payment_id")
+                 .annotate(s=Sum("amount"))
+                 .values("s")[:1])
+    Payment.objects.filter(pk=payment_id).update(
+        unapplied_amount_paisa=Cast(
+            Round((F("amount") - Coalesce(Subquery(allocated), Value(0))) * Value(100)),
+            output_field=BigIntegerField(),
+        )
+    )
+
+def refresh_order_payment_state(order_id: int):
+    """Recompute Order.payment_state; one UPDATE only when it actually changed."""
+    Order = _Order()
+    o = Order.objects.filter(pk=order_id).first()
+    if o is None:
+        return
+    state = o.compute_payment_state()
+    if state != o.payment_state:
+        Order.objects.filter(pk=order_id).update(payment_state=state)
+
+def refresh_orders_billing(order_ids):
+    """
+    After a bulk change to billing inputs (queryset.update() of include_gst, a tax-rate edit),
+    which fires no Order signals: payment_state per order, then pending per customer.
+    """
+    Order = _Order()
+    customer_ids = set()
+    for pk, customer_id in Order.objects.filter(pk__in=list(order_ids)).values_list("pk", "customer_id"):
+        refresh_order_payment_state(pk)
+        customer_ids.add(customer_id)
+    for customer_id in customer_ids:
+        refresh_customer_pending(customer_id)
 
 def _orders_with_outstanding(customer):
     """Oldest first, only final orders with >0 outstanding."""
@@ -63,9 +110,8 @@ def allocate_unapplied_for_customer(customer_id: int):
     If there are payments with room to allocate (after edits), allocate them FIFO.
     We treat 'room' as the payment.amount minus sum of its allocations.
     """
-    Payment = _Payment(); PaymentAllocation = _PaymentAllocation(); Customer = _Customer()
-    c = Customer.objects.get(pk=customer_id)
-    for p in Payment.objects.filter(customer=c):
+    Payment = _Payment(); PaymentAllocation = _PaymentAllocation()
+    for p in Payment.objects.filter(customer_id=customer_id):
         allocated = int(PaymentAllocation.objects.filter(payment=p).aggregate(s=Sum("amount"))["s"] or 0)
         cap = _toint(p.amount) - allocated
         if cap > 0:
@@ -76,17 +76,27 @@ def sync_order_material_ledger(order):
     # choose a meaningful timestamp for month cutoffs
     order_dt = _aware_midnight(getattr(order, "order_date", None))
 
+    want = {
+        "customer_id": order.customer_id,
+        "delta_kg": -need,  # negative = consumption
+        "memo": f"Consumption for Order {getattr(order, 'invoice_number', order.pk)}",
+        "date": order_dt,   # requires CustomerMaterialLedger.date to be settable (not auto_now_add)
+    }
+
+    # Runs on every Order save (signal) and again from OrderAdmin.save_related: read the
+    # row's columns once and only write when something actually changed.
     with transaction.atomic():
-        L.objects.update_or_create(
-            order=order,
-            type="OUT",
-            defaults={
-                "customer": order.customer,
-                "delta_kg": -need,  # negative = consumption
-                "memo": f"Consumption for Order {getattr(order, 'invoice_number', order.pk)}",
-                "date": order_dt,   # requires CustomerMaterialLedger.date to be settable (not auto_now_add)
-            },
+        row = (
+            L.objects.select_for_update()
+            .filter(order=order, type="OUT")
+            .values("pk", *want)
+            .first()
         )
+        if row is None:
+            L.objects.create(order=order, type="OUT", **want)
+        elif any(row[k] != v for k, v in want.items()):
+            # .update() skips auto_now; updated_at feeds the PDF cache fingerprint
+            L.objects.filter(pk=row["pk"]).update(**want, updated_at=timezone.now())
 
 
 # ----- Signals for Order -----
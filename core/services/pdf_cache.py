@@ -0,0 +1,132 @@
+# core/services/pdf_cache.py
+"""
+Content-addressed cache for generated customer PDFs (statements, ledgers, invoices).
+
+Preview → Download (or a repeated preview) of the same statement renders the
+identical PDF twice. Each document slot (kind, customer, period, user) keeps one
+rendered PDF under a version made of one aggregate per source table (row count,
+max pk, max updated_at) plus the render date, so a cache hit costs a handful of
+small queries whatever the size of the customer's history. Bulk writes must bump
+updated_at themselves (queryset .update() / bulk_update skip auto_now).
+
+The cache lives next to the generated invoices (PDF_CACHE_DIR, default
+INVOICE_OUTPUT_DIR/pdf_cache), not under the publicly served MEDIA_ROOT.
+Superseded versions are removed when a slot is re-rendered, and slots unused for
+PDF_CACHE_MAX_AGE seconds are swept on the next render.
+"""
+import os
+import shutil
+import time
+from hashlib import blake2b
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+
+from core.models import Customer, CustomerMaterialLedger, Order, OrderRoll
+from core.models.settings import SiteSettings
+from core.models_ar import Payment, PaymentAllocation
+
+CACHE_DIRNAME = "pdf_cache"
+SWEEP_MARKER = ".last_sweep"
+
+
+def cache_root() -> Path:
+    default = Path(getattr(settings, "INVOICE_OUTPUT_DIR", "invoices")) / CACHE_DIRNAME
+    return Path(getattr(settings, "PDF_CACHE_DIR", default))
+
+
+def _row_digest(h, qs):
+    """Hash every concrete column of a few rows (the customer, the site settings singleton)."""
+    fields = [f.attname for f in qs.model._meta.concrete_fields]
+    h.update(repr(list(qs.order_by("pk").values_list(*fields))).encode("utf-8"))
+
+
+def customer_ledger_version(customer_id) -> str:
+    """
+    Fingerprint of every row a customer statement or invoice reads: one aggregate per table.
+    Rolls have no updated_at; Σ weight_kg catches a weight edited in place.
+    """
+    h = blake2b(digest_size=16)
+    _row_digest(h, Customer.objects.filter(pk=customer_id))
+    _row_digest(h, SiteSettings.objects.all())  # logo, notes, tax rate
+    for model, lookup in (
+        (Order, "customer_id"),
+        (Payment, "customer_id"),
+        (PaymentAllocation, "order__customer_id"),
+        (CustomerMaterialLedger, "customer_id"),
+    ):
+        qs = model.objects.filter(**{lookup: customer_id})
+        h.update(repr(qs.aggregate(n=Count("pk"), pk=Max("pk"), at=Max("updated_at"))).encode("utf-8"))
+    rolls = OrderRoll.objects.filter(order__customer_id=customer_id)  # produced kg bills final orders
+    h.update(repr(rolls.aggregate(n=Count("pk"), pk=Max("pk"), kg=Sum("weight_kg"))).encode("utf-8"))
+    return h.hexdigest()
+
+
+def order_invoice_version(order_id) -> str:
+    """Fingerprint of an invoice (it prints the customer's balances, so the whole customer)."""
+    customer_id = Order.objects.filter(pk=order_id).values_list("customer_id", flat=True).first()
+    return customer_ledger_version(customer_id)
+
+
+def _slot_dir(*key_parts) -> Path:
+    digest = blake2b(repr(key_parts).encode("utf-8"), digest_size=16).hexdigest()
+    return cache_root() / digest
+
+
+def cached_customer_pdf(kind, customer_id, start, end, build, user=None) -> Path:
+    """
+    Return the cached PDF for this key, or call build() (→ path) once and keep a copy.
+    The original filename is kept inside the version folder for Content-Disposition.
+    """
+    slot = _slot_dir(kind, int(customer_id), start.isoformat(), end.isoformat(), getattr(user, "pk", None))
+    # the footer prints the generation date
+    version = f"{timezone.localdate():%Y%m%d}-{customer_ledger_version(customer_id)}"
+    return _cached(slot, version, build)
+
+
+def cached_order_invoice(order_id, build, user=None) -> Path:
+    """Same as cached_customer_pdf, keyed on order_invoice_version() and today's date."""
+    slot = _slot_dir("invoice", int(order_id), getattr(user, "pk", None))
+    # OVERDUE/PENDING stamp (delivery_date vs today) and the footer date change daily
+    version = f"{timezone.localdate():%Y%m%d}-{order_invoice_version(order_id)}"
+    return _cached(slot, version, build)
+
+
+def _cached(slot: Path, version: str, build) -> Path:
+    folder = slot / version
+    if folder.is_dir():
+        hit = next(folder.glob("*.pdf"), None)
+        if hit is not None:
+            os.utime(slot)  # keeps the slot out of the age sweep
+            return hit
+
+    src = Path(build())
+    folder.mkdir(parents=True, exist_ok=True)
+    dst = folder / src.name
+    shutil.copyfile(src, dst)
+    # one version per slot: the previous render can never be served again
+    for old in slot.iterdir():
+        if old != folder:
+            shutil.rmtree(old, ignore_errors=True)
+    os.utime(slot)
+    _sweep_stale_slots()
+    return dst
+
+
+def _sweep_stale_slots():
+    """Drop slots nobody asked for within PDF_CACHE_MAX_AGE (runs at most hourly)."""
+    root = cache_root()
+    max_age = int(getattr(settings, "PDF_CACHE_MAX_AGE", 7 * 24 * 3600))
+    marker = root / SWEEP_MARKER
+    now = time.time()
+    try:
+        if now - marker.stat().st_mtime < 3600:
+            return
+    except FileNotFoundError:
+        pass
+    marker.touch()
+    for slot in root.iterdir():
+        if slot.is_dir() and now - slot.stat().st_mtime > max_age:
+            shutil.rmtree(slot, ignore_errors=True)
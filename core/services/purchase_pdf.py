@@ -4,7 +4,6 @@ from pathlib import Path
 from calendar import monthrange
 from django.conf import settings
 from django.utils import timezone
-from reportlab.lib.utils import ImageReader
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.units import mm
@@ -12,6 +11,7 @@ from reportlab.platypus import Table, TableStyle
 from reportlab.pdfgen import canvas
 
 from core.models.raw_material import RawMaterialTxn
+from core.utils_pdf import logo_image
 try:
     # re-use your helpers if present
     from core.utils import _draw_page_header, _draw_footer  # adjust if you keep them elsewhere
@@ -84,20 +84,20 @@ def _collect_purchase_payments(purchase):
     rows: [[date, method, bank/ref, "Rs. …"], ...]
     total_int: integer rupees sum of linked payments.
     """
-    links = purchase.linked_payments.select_related("payment").order_by(
-        "payment__paid_on", "payment_id"
-    )
+    # one JOINed query, narrowed to the columns the table prints
+    links = purchase.linked_payments.select_related("payment").only(
+        "purchase_id", "payment_id",
+        "payment__paid_on", "payment__method", "payment__bank",
+        "payment__reference", "payment__amount_pkr",
+    ).order_by("payment__paid_on", "payment_id")
 
     rows, total_int = [], 0
     for link in links:
         pay = link.payment
         if not pay:
             continue
-        # amount from Payment (Decimal) → whole-rupees int
-        try:
-            amt_int = int(D(str(pay.amount_pkr or 0)).quantize(D("1")))
-        except Exception:
-            amt_int = 0
+        # SupplierPayment.amount_pkr is already whole rupees (BigIntegerField)
+        amt_int = int(pay.amount_pkr or 0)
 
         total_int += amt_int
 
@@ -178,7 +178,7 @@ def generate_rm_purchase_statement(purchase_id: int, *, user=None):
     logo_w, logo_h = (38 * mm, 18 * mm)
     if logo_path:
         try:
-            c.drawImage(ImageReader(logo_path), margin, top_y - logo_h,
+            c.drawImage(logo_image(logo_path), margin, top_y - logo_h,
                         width=logo_w, height=logo_h, preserveAspectRatio=True, mask="auto")
         except Exception:
             pass
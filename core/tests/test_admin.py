@@ -0,0 +1,305 @@
+import io
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.admin import EstimatedCountPaginator
+from core.models import Customer, Employee, Order, OrderRoll, SalaryPayment
+from core.models.settings import SiteSettings
+from core.models_ar import Payment
+
+
+class AdminTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        SiteSettings.objects.create(tax_rate=Decimal("17.00"))
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        cls.customer = Customer.objects.create(company_name="Acme Films", email="accounts@acme.example")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def add_orders(self, n, **kwargs):
+        orders = []
+        for i in range(n):
+            order = Order.objects.create(
+                customer=self.customer, target_total_kg=Decimal("10.5"), price_per_kg=Decimal("99.90"),
+                invoice_number=f"INV-{Order.objects.count() + 1}", **kwargs,
+            )
+            OrderRoll.objects.create(order=order, weight_kg=Decimal("4.25"))
+            orders.append(order)
+        return orders
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+
+class ChangelistQueryTests(AdminTestCase):
+    def test_order_changelist_query_count_is_flat(self):
+        url = reverse("admin:core_order_changelist")
+        self.add_orders(2, status="READY", include_gst=True)
+        baseline = self.count_queries(url)
+        self.add_orders(8, status="DRAFT")
+        with self.assertNumQueries(baseline):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "INV-10")
+
+    def test_order_changelist_sorted_by_money_columns(self):
+        self.add_orders(3, status="READY")
+        for order_field in ("5", "-6", "7"):  # grand total, paid, outstanding
+            response = self.client.get(reverse("admin:core_order_changelist"), {"o": order_field})
+            self.assertEqual(response.status_code, 200)
+
+    def test_customer_changelist_query_count_is_flat(self):
+        url = reverse("admin:core_customer_changelist")
+        self.add_orders(2, status="READY", include_gst=True)
+        baseline = self.count_queries(url)
+        for i in range(5):
+            Customer.objects.create(company_name=f"Customer {i}")
+        self.add_orders(3, status="CLOSED")
+        with self.assertNumQueries(baseline):
+            self.client.get(url)
+
+    def test_order_change_form(self):
+        order, = self.add_orders(1, status="READY")
+        response = self.client.get(reverse("admin:core_order_change", args=[order.pk]))
+        self.assertEqual(response.status_code, 200)
+
+
+class InvoiceCacheTests(AdminTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        override = override_settings(PDF_CACHE_DIR=self.tmp / "pdf_cache")
+        override.enable()
+        self.addCleanup(override.disable)
+        patcher = patch("core.admin.generate_invoice", side_effect=self.fake_invoice)
+        self.generate = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.order, = self.add_orders(1, status="READY")
+        self.today = timezone.localdate()
+
+    def fake_invoice(self, order_id, user=None):
+        path = self.tmp / f"invoice_{order_id}.pdf"
+        path.write_text(f"total={Order.objects.get(pk=order_id).grand_total_pkr} on {timezone.localdate()}")
+        return str(path)
+
+    def download(self):
+        response = self.client.get(reverse("admin:core_order_generate_pdf", args=[self.order.pk]))
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def toggle_gst(self, action):
+        return self.client.post(
+            reverse("admin:core_order_changelist"),
+            {"action": action, "_selected_action": [self.order.pk]},
+        )
+
+    def test_gst_toggle_rerenders_invoice(self):
+        self.assertEqual(self.download(), f"total=425 on {self.today}")
+        self.assertEqual(self.download(), f"total=425 on {self.today}")
+        self.assertEqual(self.generate.call_count, 1)
+
+        self.toggle_gst("include_gst_on")
+        self.assertEqual(self.download(), f"total=497 on {self.today}")
+        self.toggle_gst("include_gst_off")
+        self.assertEqual(self.download(), f"total=425 on {self.today}")
+        self.assertEqual(self.generate.call_count, 3)
+
+    def test_send_email_attaches_current_invoice(self):
+        self.download()
+        self.toggle_gst("include_gst_on")
+        self.client.get(reverse("admin:core_order_send_email", args=[self.order.pk]))
+        (attachment,) = mail.outbox[0].attachments
+        self.assertEqual(attachment[1], f"total=497 on {self.today}".encode())
+
+    def test_next_day_rerenders_invoice(self):
+        self.download()
+        with patch("django.utils.timezone.localdate", return_value=date(2099, 1, 1)):
+            self.download()
+            self.client.get(reverse("admin:core_order_send_email", args=[self.order.pk]))
+        self.assertEqual(self.generate.call_count, 2)
+        (attachment,) = mail.outbox[0].attachments
+        self.assertEqual(attachment[1], b"total=425 on 2099-01-01")
+
+    def test_send_email_reports_outcome(self):
+        response = self.client.get(reverse("admin:core_order_send_email", args=[self.order.pk]), follow=True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertContains(response, "Invoice emailed successfully.")
+
+        with patch("django.core.mail.EmailMessage.send", side_effect=OSError("SMTP down")):
+            response = self.client.get(reverse("admin:core_order_send_email", args=[self.order.pk]), follow=True)
+        self.assertContains(response, "Failed to send invoice email: SMTP down")
+
+        Customer.objects.filter(pk=self.customer.pk).update(email="")
+        response = self.client.get(reverse("admin:core_order_send_email", args=[self.order.pk]), follow=True)
+        self.assertContains(response, "Customer has no email address.")
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class GstActionTests(AdminTestCase):
+    def post_action(self, action, orders):
+        return self.client.post(
+            reverse("admin:core_order_changelist"),
+            {"action": action, "_selected_action": [o.pk for o in orders]},
+        )
+
+    def test_gst_toggle_refreshes_payment_state_and_pending(self):
+        order, = self.add_orders(1, status="READY")  # 4.25 kg × 99.90 → 425
+        Payment.objects.create(customer=self.customer, amount=Decimal("425.00"))
+        order.refresh_from_db()
+        self.assertEqual(order.payment_state, "full")
+
+        self.post_action("include_gst_on", [order])
+        order.refresh_from_db()
+        self.customer.refresh_from_db()
+        self.assertTrue(order.include_gst)
+        self.assertEqual(order.payment_state, "partial")
+        self.assertEqual(self.customer.pending_balance_pkr, 72)
+
+        self.post_action("include_gst_off", [order])
+        order.refresh_from_db()
+        self.customer.refresh_from_db()
+        self.assertEqual(order.payment_state, "full")
+        self.assertEqual(self.customer.pending_balance_pkr, 0)
+
+
+class EstimatedCountPaginatorTests(AdminTestCase):
+    def count(self, qs, estimate):
+        with patch("core.admin._estimated_row_count", return_value=estimate) as estimated:
+            return EstimatedCountPaginator(qs.order_by("pk"), 100).count, estimated.called
+
+    def test_unfiltered_big_table_uses_estimate(self):
+        self.add_orders(2)
+        self.assertEqual(self.count(Order.objects.all(), 50_000), (50_000, True))
+
+    def test_exact_count_otherwise(self):
+        self.add_orders(2)
+        self.assertEqual(self.count(Order.objects.all(), 500), (2, True))  # small table
+        self.assertEqual(self.count(Order.objects.all(), None), (2, True))  # SQLite: no estimate
+        filtered = Order.objects.filter(customer=self.customer)
+        self.assertEqual(self.count(filtered, 50_000), (2, False))
+
+    def test_changelist_on_sqlite(self):
+        self.add_orders(2)
+        response = self.client.get(reverse("admin:core_order_changelist"))
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+
+class ZipActionTests(AdminTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        override = override_settings(PDF_CACHE_DIR=self.tmp / "pdf_cache")
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def fake_pdf(self, name):
+        path = self.tmp / name
+        path.write_bytes(b"%PDF-1.4 " + name.encode())
+        return str(path)
+
+    def zip_names(self, response):
+        self.assertEqual(response["Content-Type"], "application/zip")
+        with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as zf:
+            return sorted(zf.namelist())
+
+    def test_download_invoices_for_selected(self):
+        orders = self.add_orders(2, status="READY")
+        with patch("core.admin.generate_invoice", side_effect=lambda pk, user=None: self.fake_pdf(f"inv_{pk}.pdf")):
+            response = self.client.post(
+                reverse("admin:core_order_changelist"),
+                {"action": "download_invoices_for_selected", "_selected_action": [o.pk for o in orders]},
+            )
+        self.assertEqual(self.zip_names(response), sorted(f"inv_{o.pk}.pdf" for o in orders))
+
+    def test_download_statements_for_selected(self):
+        other = Customer.objects.create(company_name="Other")
+        def statement(pk, start, end, user=None):
+            return self.fake_pdf(f"stmt_{pk}.pdf")
+
+        with patch("core.utils.generate_customer_statement_range", side_effect=statement):
+            response = self.client.post(
+                reverse("admin:core_customer_changelist"),
+                {"action": "download_statements_for_selected", "_selected_action": [self.customer.pk, other.pk]},
+            )
+        self.assertEqual(self.zip_names(response), sorted([f"stmt_{self.customer.pk}.pdf", f"stmt_{other.pk}.pdf"]))
+
+
+class ProtectedFileTests(AdminTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.tmp)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.employee = Employee.objects.create(name="Ali")
+        self.employee.contract_file.save("contrato_ñ.pdf", ContentFile(b"%PDF-1.4 contract"))
+        self.slip = SalaryPayment.objects.create(
+            employee=self.employee, period_month=1, period_year=2026, gross_amount=100, paid_amount=100,
+        )
+        self.slip.slip.save("slip.pdf", ContentFile(b"%PDF-1.4 slip"))
+        self.contract_url = reverse("admin:core_employee_file", args=[self.employee.pk, "contract_file"])
+        self.slip_url = reverse("admin:core_salarypayment_slip", args=[self.slip.pk])
+
+    def login_staff(self, *perms):
+        staff = get_user_model().objects.create_user(f"clerk{len(perms)}", password="pw", is_staff=True)
+        staff.user_permissions.set(Permission.objects.filter(codename__in=perms))
+        self.client.force_login(staff)
+
+    def test_staff_without_view_permission_is_denied(self):
+        self.login_staff("view_employee")
+        self.assertEqual(self.client.get(self.contract_url).status_code, 200)
+        self.assertEqual(self.client.get(self.slip_url).status_code, 403)
+
+        self.login_staff()
+        self.assertEqual(self.client.get(self.contract_url).status_code, 403)
+
+    def test_non_ascii_filename_header(self):
+        response = self.client.get(self.contract_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Disposition"], "inline; filename*=utf-8''contrato_%C3%B1.pdf")
+
+    def test_widgets_link_the_protected_views(self):
+        response = self.client.get(reverse("admin:core_employee_change", args=[self.employee.pk]))
+        self.assertContains(response, f'href="{self.contract_url}"')
+        self.assertContains(response, f'href="{self.slip_url}"')
+        self.assertNotContains(response, "/media/employees/")
+
+
+class MarkStatusTests(AdminTestCase):
+    def test_mark_status_saves_missing_invoice_number(self):
+        order, = self.add_orders(1)
+        Order.objects.filter(pk=order.pk).update(invoice_number="")  # legacy row
+        response = self.client.get(reverse("admin:order-mark-status", args=[order.pk, "INPROD"]))
+        self.assertRedirects(response, reverse("admin:core_order_change", args=[order.pk]))
+        order.refresh_from_db()
+        self.assertEqual(order.status, "INPROD")
+        self.assertRegex(order.invoice_number, r"^SSP-\d{5}$")
+
+    def test_mark_status_runs_transition_rules(self):
+        order, = self.add_orders(1)  # 4.25 kg produced of 10.5 kg target
+        self.client.get(reverse("admin:order-mark-status", args=[order.pk, "READY"]))
+        order.refresh_from_db()
+        self.assertEqual(order.status, "DRAFT")
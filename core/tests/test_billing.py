@@ -0,0 +1,117 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from core.models import Customer, Order, OrderRoll
+from core.models.settings import SiteSettings
+from core.models_ar import Payment, PaymentAllocation
+from core.services.ar_simple import refresh_payment_unapplied
+from core.utils_billing import (
+    order_grand_total_expr, order_grand_total_subquery, orders_grand_total_pkr,
+)
+
+
+class GrandTotalTwinTests(TestCase):
+    """The SQL grand total must equal Order.grand_total_pkr, rounding included."""
+
+    TAX = Decimal("0.17")
+
+    @classmethod
+    def setUpTestData(cls):
+        SiteSettings.objects.create(tax_rate=Decimal("17.00"))
+        cls.customer = Customer.objects.create(company_name="Twin Co")
+
+    def _order(self, kg, rate, status="DRAFT", gst=False, rolls=()):
+        order = Order.objects.create(
+            customer=self.customer, target_total_kg=Decimal(kg), price_per_kg=Decimal(rate),
+            status=status, include_gst=gst,
+        )
+        for w in rolls:
+            OrderRoll.objects.create(order=order, weight_kg=Decimal(w))
+        return order
+
+    def _sql_total(self, order):
+        row = Order.objects.filter(pk=order.pk).annotate(g=order_grand_total_subquery(self.TAX)).get()
+        return int(row.g)
+
+    def assertTwin(self, order, expected=None):
+        live = Order.objects.get(pk=order.pk).grand_total_pkr  # no annotations: model math
+        if expected is not None:
+            self.assertEqual(live, expected)
+        self.assertEqual(self._sql_total(order), live)
+
+    def test_half_even_subtotal(self):
+        self.assertTwin(self._order("2.5", "1.00"), 2)     # .5 → even rupee (down)
+        self.assertTwin(self._order("3.5", "1.00"), 4)     # .5 → even rupee (up)
+        self.assertTwin(self._order("1", "0.50"), 0)
+        self.assertTwin(self._order("1", "1.50"), 2)
+        self.assertTwin(self._order("2.6", "1.00"), 3)
+
+    def test_half_even_tax(self):
+        # subtotal 50 → tax 8.5 → 8; subtotal 150 → tax 25.5 → 26
+        self.assertTwin(self._order("50", "1.00", gst=True), 58)
+        self.assertTwin(self._order("150", "1.00", gst=True), 176)
+
+    def test_float_stored_decimals(self):
+        # SQLite keeps decimals as REAL: 10.005 × 100 must still be exactly 1000.5
+        self.assertTwin(self._order("10.005", "100.00"), 1000)
+        self.assertTwin(self._order("7.333", "13.37", gst=True))
+
+    def test_final_orders_bill_produced_rolls(self):
+        self.assertTwin(self._order("100", "10.00", status="READY", rolls=("40.250", "10.250")), 505)
+        self.assertTwin(self._order("100", "10.00", status="CLOSED", gst=True, rolls=("1.050",)))
+        self.assertTwin(self._order("100", "10.00", status="DELIVERED"), 0)  # final, no rolls yet
+
+    def test_aggregate_matches_sum_of_orders(self):
+        orders = [
+            self._order("2.5", "1.00"),
+            self._order("12.345", "67.89", gst=True),
+            self._order("5", "3.00", status="READY", gst=True, rolls=("2.500", "2.001")),
+        ]
+        expected = sum(Order.objects.get(pk=o.pk).grand_total_pkr for o in orders)
+        self.assertEqual(orders_grand_total_pkr(Order.objects.all(), self.TAX), expected)
+        self.assertEqual(orders_grand_total_pkr(Order.objects.all()), expected)  # ratio from Site Settings
+
+    def test_expression_is_flat(self):
+        sql = str(Order.objects.annotate(g=order_grand_total_subquery(self.TAX)).query)
+        self.assertEqual(sql.count("core_orderroll"), 1)
+        sql = str(Order.objects.annotate(g=order_grand_total_expr(self.TAX)).query)
+        self.assertNotIn("FLOOR", sql.upper())
+
+
+class UnappliedAmountTests(TestCase):
+    """Payment.unapplied_amount_paisa (stored) tracks amount − Σ allocations (services.ar_simple)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        SiteSettings.objects.create(tax_rate=Decimal("17.00"))
+
+    def setUp(self):
+        self.customer = Customer.objects.create(company_name="Cash Co")
+
+    def assertUnapplied(self, payment, paisa):
+        payment = Payment.objects.get(pk=payment.pk)
+        self.assertEqual(payment.unapplied_amount_paisa, paisa)
+        self.assertEqual(payment.unapplied_amount_paisa, int(payment.unapplied_amount * 100))
+
+    def test_follows_allocations_and_amount(self):
+        payment = Payment.objects.create(customer=self.customer, amount=Decimal("1000.50"))
+        self.assertUnapplied(payment, 100050)
+
+        order = Order.objects.create(customer=self.customer, target_total_kg=4, price_per_kg=100, status="READY")
+        OrderRoll.objects.create(order=order, weight_kg=Decimal("4.000"))
+        order.save()  # final: unapplied cash is allocated FIFO
+        self.assertUnapplied(payment, 60050)
+
+        PaymentAllocation.objects.filter(payment=payment).delete()
+        self.assertUnapplied(payment, 100050)
+
+        payment.amount = Decimal("250.25")
+        payment.save()  # re-allocated in whole rupees: 250 of it
+        self.assertUnapplied(payment, 25)
+
+    def test_refresh_payment_unapplied(self):
+        payment = Payment.objects.create(customer=self.customer, amount=Decimal("99.99"))
+        Payment.objects.filter(pk=payment.pk).update(unapplied_amount_paisa=0)
+        refresh_payment_unapplied(payment.pk)
+        self.assertUnapplied(payment, 9999)
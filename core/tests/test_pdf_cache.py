@@ -0,0 +1,107 @@
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import Customer, Order, OrderRoll
+from core.models.settings import SiteSettings
+from core.services import pdf_cache
+
+
+class PdfCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.settings_row = SiteSettings.objects.create(tax_rate=Decimal("17.00"))
+        cls.customer = Customer.objects.create(company_name="Cache Co")
+        cls.order = Order.objects.create(
+            customer=cls.customer, target_total_kg=Decimal("10"), price_per_kg=Decimal("100"), status="READY",
+        )
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        override = override_settings(PDF_CACHE_DIR=self.tmp / "pdf_cache")
+        override.enable()
+        self.addCleanup(override.disable)
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        path = self.tmp / f"statement-{self.builds}.pdf"
+        path.write_bytes(b"%PDF-1.4 test")
+        return path
+
+    def statement(self):
+        return pdf_cache.cached_customer_pdf(
+            "statement", self.customer.pk, date(2026, 1, 1), date(2026, 1, 31), self.build,
+        )
+
+    def version(self):
+        return pdf_cache.customer_ledger_version(self.customer.pk)
+
+    def test_version_is_stable(self):
+        self.assertEqual(self.version(), self.version())
+
+    def test_bulk_update_with_updated_at_changes_version(self):
+        before = self.version()
+        Order.objects.filter(pk=self.order.pk).update(include_gst=True, updated_at=timezone.now())
+        self.assertNotEqual(self.version(), before)
+
+    def test_hit_cost_does_not_grow_with_history(self):
+        with CaptureQueriesContext(connection) as small:
+            self.version()
+        for _ in range(20):
+            order = Order.objects.create(customer=self.customer, target_total_kg=1, price_per_kg=1)
+            OrderRoll.objects.create(order=order, weight_kg=Decimal("1.000"))
+        with self.assertNumQueries(len(small)):
+            self.version()
+
+    def test_rolls_and_settings_change_version(self):
+        before = self.version()
+        OrderRoll.objects.create(order=self.order, weight_kg=Decimal("1.000"))
+        after_roll = self.version()
+        self.assertNotEqual(after_roll, before)
+        OrderRoll.objects.filter(order=self.order).update(weight_kg=Decimal("1.500"))  # edited in place
+        self.assertNotEqual(self.version(), after_roll)
+        after_roll = self.version()
+        SiteSettings.objects.filter(pk=self.settings_row.pk).update(tax_rate=Decimal("18.00"))
+        self.assertNotEqual(self.version(), after_roll)
+
+    def test_hit_reuses_render_and_stale_version_is_evicted(self):
+        first = self.statement()
+        self.assertEqual(self.statement(), first)
+        self.assertEqual(self.builds, 1)
+
+        Order.objects.filter(pk=self.order.pk).update(price_per_kg=Decimal("120"), updated_at=timezone.now())
+        second = self.statement()
+        self.assertEqual(self.builds, 2)
+        self.assertNotEqual(second, first)
+        self.assertFalse(first.exists())
+        self.assertEqual(len(list(second.parent.parent.iterdir())), 1)  # one version per slot
+
+    def test_new_day_rerenders(self):
+        first = self.statement()
+        with patch("core.services.pdf_cache.timezone.localdate", return_value=date(2099, 1, 1)):
+            second = self.statement()
+        self.assertEqual(self.builds, 2)
+        self.assertNotEqual(second, first)
+
+    def test_stale_slots_are_swept(self):
+        old = self.statement()
+        with override_settings(PDF_CACHE_MAX_AGE=0):
+            (pdf_cache.cache_root() / pdf_cache.SWEEP_MARKER).unlink()
+            pdf_cache.cached_order_invoice(self.order.pk, self.build)
+        self.assertFalse(old.exists())
+
+    def test_cache_is_not_under_media_root(self):
+        with override_settings(PDF_CACHE_DIR=settings.PDF_CACHE_DIR):
+            root = pdf_cache.cache_root().resolve()
+        self.assertNotIn(Path(settings.MEDIA_ROOT).resolve(), root.parents)
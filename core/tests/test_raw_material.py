@@ -0,0 +1,30 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from core.models import CustomerMaterialLedger
+from core.models.raw_material import COMPANY_STOCK_NAME, RawMaterialTxn
+
+
+@patch("core.models.raw_material._COMPANY_STOCK_PK", None)
+class CompanyStockCustomerTests(TestCase):
+    def test_memoizes_pk_not_instance(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = RawMaterialTxn.company_stock_customer()  # get_or_create
+        with self.assertNumQueries(0):
+            second = RawMaterialTxn.company_stock_customer()  # memo hit
+            third = RawMaterialTxn.company_stock_customer()
+        self.assertEqual({first.pk, second.pk, third.pk}, {first.pk})
+        self.assertIsNot(second, third)
+        self.assertEqual(second.company_name, COMPANY_STOCK_NAME)
+
+        CustomerMaterialLedger.objects.create(
+            customer=first, type=CustomerMaterialLedger.EntryType.IN, delta_kg=Decimal("25.000"),
+        )
+        self.assertEqual(second.material_balance_kg, Decimal("25.000"))
+        CustomerMaterialLedger.objects.create(
+            customer=first, type=CustomerMaterialLedger.EntryType.IN, delta_kg=Decimal("5.000"),
+        )
+        self.assertEqual(third.material_balance_kg, Decimal("30.000"))  # not second's memo
+        self.assertEqual(RawMaterialTxn.company_stock_customer().country, "Pakistan")  # deferred field loads
@@ -0,0 +1,86 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from core.models import Customer, Order, OrderRoll
+from core.models.settings import SiteSettings
+from core.models_ar import Payment
+from core.utils_billing import compute_customer_balance_as_of
+
+
+class PendingBalanceSignalTests(TestCase):
+    """Order / Payment saves keep Customer.pending_balance_pkr current (services.ar_simple)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        SiteSettings.objects.create(tax_rate=Decimal("17.00"))
+
+    def setUp(self):
+        self.customer = Customer.objects.create(company_name="Signal Co", previous_pending_balance_pkr=100)
+
+    def pending(self):
+        self.customer.refresh_from_db(fields=["pending_balance_pkr"])
+        return self.customer.pending_balance_pkr
+
+    def test_order_and_payment_saves(self):
+        order = Order(customer=self.customer, target_total_kg=10, price_per_kg=100)
+        order.save()  # DRAFT: not billable yet
+        self.assertEqual(self.pending(), 100)
+
+        OrderRoll.objects.create(order=order, weight_kg=Decimal("10.000"))
+        order.status = "READY"
+        order.include_gst = True
+        order.save()
+        self.assertEqual(self.pending(), 100 + 1170)
+
+        Payment.objects.create(customer=self.customer, amount=Decimal("300.00"))
+        self.assertEqual(self.pending(), 970)
+        self.assertEqual(self.pending(), compute_customer_balance_as_of(self.customer))
+        self.assertEqual(self.customer.pending_balance_live_pkr, 970)
+
+
+class PaymentStateSignalTests(TestCase):
+    """Order.payment_state follows every billing input, including ones changed without Order.save()."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.site = SiteSettings.objects.create(tax_rate=Decimal("17.00"))
+
+    def setUp(self):
+        self.customer = Customer.objects.create(company_name="State Co")
+        self.order = Order.objects.create(customer=self.customer, target_total_kg=10, price_per_kg=100)
+        OrderRoll.objects.create(order=self.order, weight_kg=Decimal("10.000"))
+
+    def state(self):
+        self.order.refresh_from_db(fields=["payment_state"])
+        return self.order.payment_state
+
+    def test_transitions(self):
+        self.order.status = "READY"
+        self.order.save()
+        self.assertEqual(self.state(), "pending")
+
+        Payment.objects.create(customer=self.customer, amount=Decimal("400.00"))
+        self.assertEqual(self.state(), "partial")
+        Payment.objects.create(customer=self.customer, amount=Decimal("600.00"))
+        self.assertEqual(self.state(), "full")
+
+        OrderRoll.objects.create(order=self.order, weight_kg=Decimal("1.000"))  # 1100 billed
+        self.assertEqual(self.state(), "partial")
+
+    def test_tax_rate_change(self):
+        self.order.status = "READY"
+        self.order.include_gst = True
+        self.order.save()
+        Payment.objects.create(customer=self.customer, amount=Decimal("1170.00"))
+        self.assertEqual(self.state(), "full")
+
+        self.site.tax_rate = Decimal("18.00")  # 1180 billed
+        self.site.save()
+        self.assertEqual(self.state(), "partial")
+        self.customer.refresh_from_db(fields=["pending_balance_pkr"])
+        self.assertEqual(self.customer.pending_balance_pkr, 10)
+
+        self.site.tax_rate = Decimal("17.00")
+        self.site.save()
+        self.assertEqual(self.state(), "full")
@@ -9,7 +9,6 @@ from django.db.models.functions import Coalesce
 
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.utils import ImageReader
 from reportlab.lib import colors
 from reportlab.lib.units import mm
 from reportlab.platypus import Table, TableStyle, Paragraph
@@ -29,7 +28,8 @@ from .utils_pdf import (
     cell_text, auto_col_widths, build_auto_table,
     draw_multiline_left, draw_multiline_right,
     get_billing_theme, period_bounds, period_bounds_from_dates,
-    statement_path, nice_range_label, _as_lines, escape, stringWidth
+    statement_path, nice_range_label, _as_lines, escape, stringWidth,
+    logo_image,
 )
 
 # Site settings
@@ -467,7 +467,6 @@ def _render_statement_compact(
     from reportlab.platypus import Table, TableStyle
     from reportlab.lib import colors
     from reportlab.lib.units import mm
-    from reportlab.lib.utils import ImageReader
 
     payment_lines = payment_lines or []
     orders_qty_total = orders_qty_total or Decimal("0.000")
@@ -492,7 +491,7 @@ def _render_statement_compact(
 
     logo_w, logo_h = (32 * mm, 16 * mm)
     if logo_path:
-        try: c.drawImage(ImageReader(logo_path), margin, top_y - logo_h, width=logo_w, height=logo_h,
+        try: c.drawImage(logo_image(logo_path), margin, top_y - logo_h, width=logo_w, height=logo_h,
                          preserveAspectRatio=True, mask="auto")
         except Exception: pass
 
@@ -971,7 +970,7 @@ def generate_customer_statement_range(customer_id: int, start_date: date, end_da
     logo_w, logo_h = (38 * mm, 18 * mm)
     if logo_path:
         try:
-            c.drawImage(ImageReader(logo_path), margin, top_y - logo_h, width=logo_w, height=logo_h,
+            c.drawImage(logo_image(logo_path), margin, top_y - logo_h, width=logo_w, height=logo_h,
                         preserveAspectRatio=True, mask="auto")
         except Exception:
             pass
@@ -1517,7 +1516,7 @@ def generate_customer_monthly_statement(customer_id: int, year: int, month: int,
     logo_w, logo_h = (38 * mm, 18 * mm)
     if logo_path:
         try:
-            c.drawImage(ImageReader(logo_path), margin, top_y - logo_h,
+            c.drawImage(logo_image(logo_path), margin, top_y - logo_h,
                         width=logo_w, height=logo_h,
                         preserveAspectRatio=True, mask="auto")
         except Exception:
@@ -1895,7 +1894,8 @@ def generate_invoice(order_id, user=None, out_path=None):
     else:
         is_overdue = False
         try:
-            if order.delivery_date and order.delivery_date < date.today():
+            # same day as the invoice cache key (pdf_cache.cached_order_invoice)
+            if order.delivery_date and order.delivery_date < timezone.localdate():
                 is_overdue = True
         except Exception:
             is_overdue = False
@@ -1929,7 +1929,7 @@ def generate_invoice(order_id, user=None, out_path=None):
     logo_w, logo_h = (38 * mm, 18 * mm)
     if logo_path:
         try:
-            c.drawImage(ImageReader(logo_path), margin, top_y - logo_h, width=logo_w, height=logo_h,
+            c.drawImage(logo_image(logo_path), margin, top_y - logo_h, width=logo_w, height=logo_h,
                         preserveAspectRatio=True, mask="auto")
         except Exception:
             pass
@@ -2109,7 +2109,7 @@ def generate_invoice(order_id, user=None, out_path=None):
 # Email sender (PDF)
 # ====================
 def send_invoice_email(order_id, pdf_path, to_email=None, subject=None, body=None):
-    order = Order.objects.get(id=order_id)
+    order = Order.objects.select_related("customer").get(id=order_id)
     pdf_path = str(Path(pdf_path))
 
     recipient = to_email or (order.customer.email or "").strip()
@@ -2238,7 +2238,7 @@ def generate_customer_ledger_pdf(customer_id, start_date, end_date, user=None) -
     if logo_path:
         try:
             c.drawImage(
-                ImageReader(logo_path),
+                logo_image(logo_path),
                 margin, top_y - logo_h, width=logo_w, height=logo_h,
                 preserveAspectRatio=True, mask="auto"
             )
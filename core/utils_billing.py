@@ -4,11 +4,14 @@ from datetime import date
 from decimal import Decimal
 
 from django.db.models import Sum, IntegerField, DecimalField
-from django.db.models.functions import Coalesce
+from django.db.models import Case, When, F, Q, OuterRef, Subquery, ExpressionWrapper
+from django.db.models.functions import Cast, Coalesce, Round
+from django.db.models.lookups import LessThan, LessThanOrEqual
 from django.db.models import Value
 from django.utils import timezone
 
-from core.models import Order, CustomerMaterialLedger
+from core.models import Order, OrderRoll, CustomerMaterialLedger
+from core.models.orders import site_tax_ratio
 from core.models_ar import Payment, FINAL_STATES
 from core.utils_money import D, round_to
 from core.utils_weight import dkg
@@ -29,16 +32,13 @@ def compute_customer_balance_as_of(customer, as_of=None):
     carry = int(customer.previous_pending_balance_pkr or 0)
 
     # ---- 2) Orders up to date ----
-    charges_total = 0
     orders_qs = Order.objects.filter(
         customer=customer,
         status__in=FINAL_STATES,
         order_date__lte=as_of,
     )
-
-    for o in orders_qs:
-        # the same logic used in your PDF generator
-        charges_total += int(getattr(o, "grand_total_pkr", 0) or 0)
+    # the same logic used in your PDF generator, summed in one query
+    charges_total = orders_grand_total_pkr(orders_qs)
 
 
     # ---- 3) Payments up to date ----
@@ -80,3 +80,176 @@ def compute_customer_balance_as_of(customer, as_of=None):
     # ---- 5) Final live balance ----
     closing_due = carry + charges_total + neg_dana_charge - payments_total
     return int(closing_due)
+
+
+# ---------------------------------------------------------------------------
+# SQL twins (changelists): same math as above, one query per page
+# ---------------------------------------------------------------------------
+KG = DecimalField(max_digits=12, decimal_places=3)
+MONEY = DecimalField(max_digits=18, decimal_places=2)
+RATIO = DecimalField(max_digits=9, decimal_places=6)
+
+
+def produced_kg_subquery(ref="pk"):
+    """Σ OrderRoll.weight_kg for the order at OuterRef(ref), 0 when no rolls."""
+    sq = (
+        OrderRoll.objects
+        .filter(order_id=OuterRef(ref))
+        .values("order_id")
+        .annotate(s=Sum("weight_kg"))
+        .values("s")[:1]
+    )
+    return Coalesce(Subquery(sq, output_field=KG), Value(Decimal("0.000"), output_field=KG))
+
+
+INT = IntegerField()
+
+
+def _units(expr, places):
+    """Decimal column/aggregate → whole number of 10^-places units (grams, paisa), rounded once."""
+    return Cast(Round(ExpressionWrapper(expr * Value(10 ** places), output_field=INT)), INT)
+
+
+def _half_even_div(num, den):
+    """
+    SQL twin of Order's rupee rounding (Decimal.quantize(1) → ROUND_HALF_EVEN) for num / den,
+    in integer arithmetic: num = 2·den·q + r, so the result is 2q plus 0, 1 or 2 by where r
+    falls (r = den and r = 3·den are the .5 ties). No CAST/ROUND/FLOOR nesting, and `num`
+    appears twice, so the expression stays flat enough for SQLite's parser.
+    Assumes num >= 0 (kg and rates are never negative).
+    """
+    r = ExpressionWrapper(num % Value(2 * den), output_field=INT)
+    step = Case(
+        When(LessThanOrEqual(r * Value(2), Value(den)), then=Value(0)),
+        When(LessThan(r * Value(2), Value(3 * den)), then=Value(1)),
+        default=Value(2),
+        output_field=INT,
+    )
+    return ExpressionWrapper((num - r) / Value(den) + step, output_field=INT)
+
+
+def order_grand_total_expr(tax_ratio):
+    """
+    Order.grand_total_pkr as SQL over Order rows grouped with their rolls (the rolls Σ is an
+    aggregate of the JOIN, not a correlated subquery repeated in every branch):
+    round(billable grams × paisa / 10^5) + round(subtotal × tax_ratio) when include_gst.
+    """
+    produced_g = Coalesce(_units(Sum("rolls__weight_kg"), 3), Value(0), output_field=INT)
+    billable_g = Case(
+        When(status__in=FINAL_STATES, then=produced_g),
+        default=_units(F("target_total_kg"), 3),
+        output_field=INT,
+    )
+    subtotal = _half_even_div(
+        ExpressionWrapper(billable_g * _units(F("price_per_kg"), 2), output_field=INT), 10 ** 5,
+    )
+    num, den = D(tax_ratio).as_integer_ratio()
+    tax = Case(
+        When(include_gst=True, then=_half_even_div(ExpressionWrapper(subtotal * Value(num), output_field=INT), den)),
+        default=Value(0),
+        output_field=INT,
+    )
+    return ExpressionWrapper(subtotal + tax, output_field=INT)
+
+
+def order_grand_total_subquery(tax_ratio, ref="pk"):
+    """order_grand_total_expr for the order at OuterRef(ref): one rolls JOIN + GROUP BY per order."""
+    sq = (
+        Order.objects
+        .filter(pk=OuterRef(ref))
+        .order_by()
+        .values("pk")
+        .annotate(g=order_grand_total_expr(tax_ratio))
+        .values("g")[:1]
+    )
+    return Coalesce(Subquery(sq, output_field=INT), Value(0), output_field=INT)
+
+
+def orders_grand_total_pkr(orders_qs, tax_ratio=None) -> int:
+    """
+    Σ Order.grand_total_pkr over `orders_qs` as a single aggregate, instead of
+    loading each order (one rolls aggregate + one Site Settings read per row).
+    """
+    if tax_ratio is None:
+        tax_ratio = site_tax_ratio()
+    total = orders_qs.annotate(g=order_grand_total_expr(tax_ratio)).aggregate(s=Sum("g"))["s"]
+    return int(total or 0)
+
+
+def annotate_customer_balance(qs, as_of=None):
+    """
+    SQL twin of compute_customer_balance_as_of for Customer querysets.
+    Annotates:
+      - carry_paid_calc: Σ positive payments (rupees), read by Customer.carry_remaining_pkr
+      - pending_calc:    carry + final charges + negative Dana − payments, up to `as_of`
+    Correlated subqueries only, so no JOIN fan-out with other annotations.
+    """
+    if as_of is None:
+        as_of = timezone.localdate()
+
+    ss = get_site_settings()
+    tax_ratio = site_tax_ratio(ss)
+    neg_enabled_global = bool(getattr(ss, "enable_negative_dana_charges", False))
+    neg_rate_global = D(getattr(ss, "negative_dana_default_rate_pkr", 0) or 0)
+
+    charges_sq = (
+        Order.objects
+        .filter(customer_id=OuterRef("pk"), status__in=FINAL_STATES, order_date__lte=as_of)
+        .annotate(g=order_grand_total_subquery(tax_ratio))
+        .order_by()
+        .values("customer_id")
+        .annotate(s=Sum("g"))
+        .values("s")[:1]
+    )
+    payments_sq = (
+        Payment.objects
+        .filter(customer_id=OuterRef("pk"), received_on__lte=as_of)
+        .order_by()
+        .values("customer_id")
+        .annotate(s=Sum("amount"))
+        .values("s")[:1]
+    )
+    carry_paid_sq = (
+        Payment.objects
+        .filter(customer_id=OuterRef("pk"), amount__gt=0)
+        .order_by()
+        .values("customer_id")
+        .annotate(s=Sum(Round("amount")))
+        .values("s")[:1]
+    )
+    closing_kg_sq = (
+        CustomerMaterialLedger.objects
+        .filter(customer_id=OuterRef("pk"), date__lte=as_of)
+        .order_by()
+        .values("customer_id")
+        .annotate(s=Sum("delta_kg"))
+        .values("s")[:1]
+    )
+    zero = Value(Decimal("0"), output_field=MONEY)
+
+    return (
+        qs.alias(
+            _charges=Coalesce(Subquery(charges_sq, output_field=MONEY), zero),
+            _payments=Coalesce(Subquery(payments_sq, output_field=MONEY), zero),
+            _closing_kg=Coalesce(Subquery(closing_kg_sq, output_field=KG), Value(Decimal("0.000"), output_field=KG)),
+            _neg_enabled=Coalesce(F("charge_negative_dana"), Value(neg_enabled_global)),
+            _neg_rate=Coalesce(F("negative_dana_rate_pkr"), Value(neg_rate_global, output_field=MONEY)),
+        )
+        .alias(
+            _neg_charge=Case(
+                When(
+                    Q(_neg_enabled=True) & Q(_closing_kg__lt=0) & Q(_neg_rate__gt=0),
+                    then=Round(ExpressionWrapper(-F("_closing_kg") * F("_neg_rate"), output_field=MONEY)),
+                ),
+                default=zero,
+                output_field=MONEY,
+            ),
+        )
+        .annotate(
+            carry_paid_calc=Coalesce(Subquery(carry_paid_sq, output_field=MONEY), zero),
+            pending_calc=ExpressionWrapper(
+                F("previous_pending_balance_pkr") + F("_charges") + F("_neg_charge") - F("_payments"),
+                output_field=MONEY,
+            ),
+        )
+    )
@@ -24,6 +24,12 @@ def money_mul(kg, price_per_kg) -> Decimal:
     """Exact subtotal in Decimal PKR before rounding to rupees int."""
     return D(kg) * D(price_per_kg)
 
+def fmt_paisa(n: int) -> str:
+    """Integer paisa -> '12,345.67' (int div/mod only, no Decimal formatting)."""
+    sign = "-" if n < 0 else ""
+    n = abs(n)
+    return f"{sign}{n // 100:,}.{n % 100:02d}"
+
 # ---- Compatibility shims (so older imports keep working) ----
 def _to_decimal(x) -> Decimal:
     """Back-compat alias for D()."""
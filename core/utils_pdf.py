@@ -1,5 +1,6 @@
 # core/utils_pdf.py
 from __future__ import annotations
+from functools import lru_cache
 from pathlib import Path
 from decimal import Decimal
 from datetime import date, datetime
@@ -13,6 +14,7 @@ from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.enums import TA_LEFT, TA_RIGHT
 from reportlab.lib import colors
 from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.lib.utils import ImageReader
 from xml.sax.saxutils import escape
 
 # money utils from your project
@@ -132,6 +134,21 @@ def draw_multiline_right(c, lines, x_right, y, *, leading=12, font="Helvetica",
         c.drawRightString(x_right, cur, ln); cur -= leading
     return cur
 
+def logo_image(path):
+    """
+    Shared ImageReader for the company logo. Decoding the image is the fixed cost of
+    every PDF; reuse it across renders until the file changes (keyed on mtime).
+    """
+    try:
+        mtime = Path(path).stat().st_mtime
+    except OSError:
+        return ImageReader(path)
+    return _logo_image_cached(str(path), mtime)
+
+@lru_cache(maxsize=4)
+def _logo_image_cached(path, mtime):
+    return ImageReader(path)
+
 # ---------- Themes & period bounds ----------
 def get_billing_theme(ss, default="default"):
     try:
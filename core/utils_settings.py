@@ -59,13 +59,16 @@ class SiteSettingsAdmin(admin.ModelAdmin):
     )
 
     def has_add_permission(self, request):
-        # Allow add only if no instance exists (singleton)
-        return not SiteSettings.objects.exists()
+        # Allow add only if no instance exists (singleton).
+        # Asked several times per page (sidebar, index, change form); one EXISTS per request.
+        if "_ssp_settings_exist" not in request.__dict__:
+            request._ssp_settings_exist = SiteSettings.objects.exists()
+        return not request._ssp_settings_exist
 
     def changelist_view(self, request, extra_context=None):
-        # Redirect list → edit page for the single instance
-        obj = SiteSettings.objects.first()
-        if obj:
+        # Redirect list → edit page for the single instance (pk only, not the whole row)
+        pk = SiteSettings.objects.order_by("pk").values_list("pk", flat=True).first()
+        if pk is not None:
             from django.shortcuts import redirect
-            return redirect(f"/admin/core/sitesettings/{obj.pk}/change/")
+            return redirect(f"/admin/core/sitesettings/{pk}/change/")
         return super().changelist_view(request, extra_context)
@@ -19,6 +19,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Folder to store generated invoices
 INVOICES_ROOT = BASE_DIR / "invoices"
 INVOICES_ROOT.mkdir(parents=True, exist_ok=True)  # auto-create on startup
+# where generate_invoice & friends write PDFs; absolute so it does not depend on the
+# worker's cwd and the front-end server can alias it (see PDF_SENDFILE_HEADER)
+INVOICE_OUTPUT_DIR = INVOICES_ROOT
 INVOICE_ROUNDING = {
     "mode": "ceil",       # ceil | half_up | floor (ceil = always round up)
     "quantum": "1",       # '1' rupee, or '10' to round up to next 10, etc.
@@ -185,6 +188,18 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Let the front-end server stream generated PDFs (zero-copy) instead of Python:
+#   "X-Accel-Redirect" (nginx, internal location aliased to INVOICE_OUTPUT_DIR) or "X-Sendfile" (apache)
+# Empty = Django FileResponse (uses wsgi.file_wrapper / sendfile when the server provides it).
+PDF_SENDFILE_HEADER = os.getenv("DJANGO_PDF_SENDFILE_HEADER", "")
+PDF_SENDFILE_PREFIX = os.getenv("DJANGO_PDF_SENDFILE_PREFIX", "/protected-pdf/")
+# internal location aliased to MEDIA_ROOT (employee files, salary slips)
+MEDIA_SENDFILE_PREFIX = os.getenv("DJANGO_MEDIA_SENDFILE_PREFIX", "/protected-media/")
+# rendered statement/invoice cache (core.services.pdf_cache): inside INVOICE_OUTPUT_DIR so it is
+# never under MEDIA_URL; slots unused for PDF_CACHE_MAX_AGE seconds are swept
+PDF_CACHE_DIR = INVOICES_ROOT / "pdf_cache"
+PDF_CACHE_MAX_AGE = int(os.getenv("DJANGO_PDF_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+
 # -----------------------------------
 # Default primary key field type
 # -----------------------------------
@@ -1,8 +1,8 @@
 # polyroll_mgmt/urls.py
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from django.views.static import serve
 from core import views as core_views  # your dashboard view
 
 urlpatterns = [
@@ -11,4 +11,12 @@ urlpatterns = [
 
     path('', core_views.dashboard, name='dashboard'),     # protect with @login_required
     path('', include('core.urls')),                       # app routes
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+if settings.DEBUG:
+    # dev-only media; employee photos/contracts/salary slips (MEDIA_ROOT/employees/) are never
+    # served by URL, only through the permission-checked admin views (core_employee_file / core_salarypayment_slip)
+    urlpatterns += [
+        re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?!employees/)(?P<path>.*)$", serve,
+                {"document_root": settings.MEDIA_ROOT}),
+    ]